@@ -1,22 +1,55 @@
 import os
+import copy
 import shutil
 import logging
 import datetime
 import json
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
-from jinja2 import Environment, FileSystemLoader
+import re
+import time
+import heapq
+import itertools
+import cProfile
+import pstats
+import io
+from contextlib import contextmanager
+# concurrent.futures loads its executors on first attribute access; the process pool
+# machinery is only imported once a build actually renders in parallel.
+import concurrent.futures
+from xml.sax.saxutils import escape as xml_escape
+from jinja2 import FileSystemLoader
 
 # Import necessary components from other modules
 from .front_matter_parser import parse_front_matter
 from .url_helpers import url, static # Ensure 'static' is imported here if used globally, or passed
 from .jinja_extensions import TagExtension
-from .plugin_system import run_hook, load_plugins
+from . import plugin_system
+from .plugin_system import run_hook, has_hook, load_plugins
 from .config_loader import load_config
-from .data_collections_loader import load_data_files, load_collections
+from .data_collections_loader import load_data_files, load_collections, load_collection_item, collection_file_paths
+from .build_manifest import BuildManifest, MANIFEST_FILE_NAME, hash_json, config_hash, get_cache_dir
+from .template_cache import CachingEnvironment, prune_compiled_cache
+from .file_sync import copy_file, sync_tree, copy_tree, log_sync_stats
+from .output_staging import OutputStage
+from .xml_writer import StreamingXMLWriter
+from .json_cache import JSONFileCache
+from .template_deps import template_dependency_files
+from .build_report import BuildTimer, get_report_path, write_report
+from .build_trace import tracer, get_trace_path, write_trace
+from .build_memory import memory_profiler, get_memory_report_path, log_memory_report, write_memory_report
+from .site_access import ALL_KEYS, SiteAccessLog, TrackedMapping, site_access_hashes
 
 logger = logging.getLogger(__name__)
 
+def _compiled_cache_dir(config):
+    """Directory of the compiled template cache, or None with "template_cache": false."""
+    return os.path.join(get_cache_dir(config), "templates") if config.get("template_cache", True) else None
+
+def _prune_template_cache(config):
+    """Evicts least recently used compiled templates beyond "template_cache_max_mb" (default 256)."""
+    cache_dir = _compiled_cache_dir(config)
+    if cache_dir and os.path.isdir(cache_dir):
+        prune_compiled_cache(cache_dir, config.get("template_cache_max_mb", 256) * 1024 * 1024)
+
 def setup_jinja_environment(config, site_data, collections_data):
     """Sets up the Jinja2 environment with template loader and custom globals/extensions."""
     logger.info("Setting up Jinja2 environment")
@@ -28,7 +61,16 @@ def setup_jinja_environment(config, site_data, collections_data):
         if "path" in collection_settings and os.path.exists(collection_settings["path"]):
             loader_paths.append(collection_settings["path"])
 
-    env = Environment(loader=FileSystemLoader(loader_paths), extensions=[TagExtension])
+    # Compiled templates (layouts and from_string page bodies) are cached on disk unless disabled
+    env = CachingEnvironment(loader=FileSystemLoader(loader_paths), extensions=[TagExtension],
+                             compiled_cache_dir=_compiled_cache_dir(config))
+
+    # With "track_site_access", 'site.data' and 'site.collections' record which keys each page reads
+    env.site_access = None
+    if config.get("track_site_access", False):
+        env.site_access = SiteAccessLog()
+        site_data = TrackedMapping(site_data, env.site_access, "data")
+        collections_data = TrackedMapping(collections_data, env.site_access, "collections")
     
     # Make site-wide data and config available under 'site' global
     env.globals.update({
@@ -43,6 +85,24 @@ def setup_jinja_environment(config, site_data, collections_data):
     })
     return env
 
+@contextmanager
+def _open_output_file(output_path):
+    """Opens an output file for writing through a temporary file renamed into place on success."""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            yield f
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _write_output_file(output_path, text):
+    """Writes a whole text output file through _open_output_file."""
+    with _open_output_file(output_path) as f:
+        f.write(text)
+
 def _render_and_save_output(env, config, template_obj, context, output_path, source_file_path, content_for_sitemap_rss=None):
     """Internal helper to render a Jinja2 template and save it to a file."""
     try:
@@ -51,9 +111,7 @@ def _render_and_save_output(env, config, template_obj, context, output_path, sou
         logger.error(f"Error rendering template from '{source_file_path}' to '{output_path}': {e}")
         return None
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(output)
+    _write_output_file(output_path, output)
     logger.info("Rendered: %s -> %s", source_file_path, output_path)
     
     # Return info for sitemap/RSS
@@ -65,15 +123,29 @@ def _render_and_save_output(env, config, template_obj, context, output_path, sou
         "content": content_for_sitemap_rss # Use the content passed for sitemap/RSS
     }
 
+def _asset_file_path(file_path_relative_to_assets, config):
+    """Returns the on-disk path of a file referenced relative to the assets directory."""
+    return os.path.join(config["assets_dir"], file_path_relative_to_assets.lstrip('/'))
+
+def _page_data_file_paths(front_matter, config):
+    """Returns the on-disk paths of the 'data_file'/'data_files' referenced by a page's front matter."""
+    if "data_file" in front_matter:
+        return [_asset_file_path(front_matter["data_file"], config)]
+    if "data_files" in front_matter and isinstance(front_matter["data_files"], list):
+        return [_asset_file_path(df_path, config) for df_path in front_matter["data_files"]]
+    return []
+
+# Build-scoped cache of parsed page data files; reset by build_command at the start of each build.
+asset_json_cache = JSONFileCache()
+
 def _load_json_file_from_assets(file_path_relative_to_assets, config):
-    """Helper to load a JSON file from the assets directory and return its content."""
-    full_path = os.path.join(config["assets_dir"], file_path_relative_to_assets.lstrip('/'))
+    """Helper to load a JSON file from the assets directory and return its (shared, read-only) content."""
+    full_path = _asset_file_path(file_path_relative_to_assets, config)
     if not os.path.exists(full_path):
         logger.warning(f"Page data asset file not found: {full_path}")
         return {}
     try:
-        with open(full_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return asset_json_cache.load(full_path)
     except json.JSONDecodeError as e:
         logger.error(f"Error decoding JSON from page data asset file {full_path}: {e}")
         return {}
@@ -82,250 +154,911 @@ def _load_json_file_from_assets(file_path_relative_to_assets, config):
         return {}
 
 
-def render_all_content(config, site_data, collections_data):
-    """Renders all pages and collection items."""
-    env = setup_jinja_environment(config, site_data, collections_data)
-    rendered_pages_info = [] # To store info for sitemap/RSS
+def _load_page_data(front_matter, config):
+    """Loads a page's 'data_file' or merged 'data_files' from assets. Returns (page_data, data_json_urls)."""
+    page_data = {} # Data for server-side rendering
+    data_json_urls = [] # URLs for client-side fetching
+
+    # Load single data_file from assets. Cached JSON is shared between pages, so each page gets its own copy.
+    if "data_file" in front_matter:
+        page_data = copy.deepcopy(_load_json_file_from_assets(front_matter["data_file"], config))
+        # Note: url() helper now uses config['assets_dir'] internally for assets
+        data_json_urls.append(url(front_matter["data_file"], config)) 
+    # Load multiple data_files from assets
+    elif "data_files" in front_matter and isinstance(front_matter["data_files"], list):
+        for df_path in front_matter["data_files"]:
+            page_data.update(copy.deepcopy(_load_json_file_from_assets(df_path, config))) # Merge data
+            data_json_urls.append(url(df_path, config)) # Collect all URLs
+    return page_data, data_json_urls
+
+def _dependency_hash(config, site_data, collections_data, manifest, listing=True):
+    """Hash of what a page depends on besides its source and templates (config, plugins, data, collections)."""
+    dependencies = {
+        "config": config_hash(config),
+        "plugins": plugin_system.render_plugin_fingerprints(),
+    }
+    if not config.get("track_site_access", False):
+        dependencies["data"] = hash_json(site_data)
+        if listing:
+            dependencies["collections"] = [
+                (item["path"], manifest.fingerprint(item["path"])["sha1"])
+                for items in collections_data.values() for item in items
+            ]
+    return hash_json(dependencies)
+
+def _page_dependency_hashes(config, site_data, collections_data, manifest, listing_pages):
+    """Returns source path -> dependency hash; only 'listing_pages' (all pages when None) depend on collections."""
+    page_hash = _dependency_hash(config, site_data, collections_data, manifest, listing=False)
+    listing_hash = _dependency_hash(config, site_data, collections_data, manifest)
+    return lambda source_path: listing_hash if listing_pages is None or source_path in listing_pages else page_hash
+
+def _site_access_record(site_keys, site_hashes):
+    """The manifest 'site' entry of a page: each site key it read -> that key's current hash."""
+    if site_keys is None:
+        return None
+    return {key: site_hashes.get(key) for key in site_keys}
 
-    # Render regular pages (from pages_dir)
+def _reuse_page_info(manifest, output_path, content):
+    """Keeps a still-valid output and returns its sitemap/RSS info from the manifest."""
+    entry = manifest.keep(output_path)
+    logger.debug("Up to date: %s -> %s", entry["source"], output_path)
+    return dict(entry["info"], output_path=output_path, content=content)
+
+def _source_lastmod(manifest, source_path):
+    """W3C datetime of a source's modification time, taken from its cached manifest fingerprint."""
+    mtime = manifest.fingerprint(source_path)["mtime_ns"] / 1e9
+    return datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+def _manifest_page_info(page_info):
+    """Page info as stored in the manifest (the body content is not persisted)."""
+    info = {k: v for k, v in page_info.items() if k != "content"}
+    # Snapshot the front matter so the manifest never aliases dicts shared with templates.
+    info["front_matter"] = dict(info["front_matter"])
+    return info
+
+def _collect_render_tasks(config, collections_data):
+    """Lists every page and collection item to render, as plain dicts, in serial build order."""
+    tasks = []
+
+    # Regular pages (from pages_dir)
     logger.info("Rendering regular pages from %s", config["pages_dir"])
     for root, _, files in os.walk(config["pages_dir"]):
         for page_file in files:
             if page_file.endswith('.html'): # Only process HTML files
                 page_source_path = os.path.join(root, page_file)
                 output_relative_path = os.path.relpath(page_source_path, config["pages_dir"]) 
-                output_path = os.path.join(config["output_dir"], output_relative_path)
-
-                run_hook("before_render_page", page_path=page_source_path, config=config)
-
-                with open(page_source_path, 'r', encoding='utf-8') as f:
-                    full_file_content = f.read()
-                front_matter, body_content_after_fm = parse_front_matter(full_file_content)
-
-                page_data = {} # Data for server-side rendering
-                data_json_urls = [] # URLs for client-side fetching
-
-                # Load single data_file from assets
-                if "data_file" in front_matter:
-                    page_data = _load_json_file_from_assets(front_matter["data_file"], config)
-                    # Note: url() helper now uses config['assets_dir'] internally for assets
-                    data_json_urls.append(url(front_matter["data_file"], config)) 
-                # Load multiple data_files from assets
-                elif "data_files" in front_matter and isinstance(front_matter["data_files"], list):
-                    for df_path in front_matter["data_files"]:
-                        page_data.update(_load_json_file_from_assets(df_path, config)) # Merge data
-                        data_json_urls.append(url(df_path, config)) # Collect all URLs
-
-                try:
-                    # For pages in 'pages_dir', the content after front matter is the template itself
-                    # that extends a base layout (e.g., base.html).
-                    template_obj = env.from_string(body_content_after_fm)
-                except Exception as e:
-                    logger.error(f"Error creating template from string for page '{page_source_path}': {e}. Ensure it has `{{% extends \"base.html\" %}}` and valid Jinja2 syntax.")
-                    continue # Skip this page if template cannot be created
-
-                context = {
-                    "page": {
-                        "front_matter": front_matter,
-                        "data": page_data, # Make page-specific data available for server-side rendering
-                        "data_json_urls": data_json_urls, # Pass URLs to the template for client-side fetching
-                        "url": url(output_relative_path, config),
-                        "canonical": f"{config['base_url']}/{output_relative_path.lstrip('/')}",
-                        "absolute_final_url": url(output_relative_path, config)
-                    },
-                    "site": env.globals["site"]
-                }
-                
-                page_info = _render_and_save_output(env, config, template_obj, context, output_path, page_source_path, content_for_sitemap_rss=body_content_after_fm)
-                if page_info:
-                    rendered_pages_info.append(page_info)
-                run_hook("after_render_page", page_path=page_source_path, output_path=output_path, config=config)
-
-
-    # Render collection items (from collections config)
+                tasks.append({
+                    "kind": "page",
+                    "source_path": page_source_path,
+                    "output_relative_path": output_relative_path,
+                    "output_path": os.path.join(config["output_dir"], output_relative_path),
+                })
+
+    # Collection items (from collections config)
     for collection_name, items in collections_data.items():
         logger.info(f"Rendering collection '{collection_name}' items.")
-        for item in items:
-            page_source_path = item["path"]
-            
+        for index, item in enumerate(items):
             # output_relative_path for collection items (e.g., blog/first-post.html)
-            output_relative_path = os.path.join(config["collections"][collection_name]["output"], os.path.basename(page_source_path))
-            output_path = os.path.join(config["output_dir"], output_relative_path)
-            
-            run_hook("before_render_page", page_path=page_source_path, config=config)
-
-            layout_name = item["front_matter"].get("layout")
-            if not layout_name:
-                logger.warning(f"Collection item '{page_source_path}' has no 'layout' specified in front matter. Skipping.")
-                continue
-
-            # Collection items can also have page-specific data files from assets
-            page_data = {}
-            data_json_urls = []
-            if "data_file" in item["front_matter"]:
-                page_data = _load_json_file_from_assets(item["front_matter"]["data_file"], config)
-                data_json_urls.append(url(item["front_matter"]["data_file"], config))
-            elif "data_files" in item["front_matter"] and isinstance(item["front_matter"]["data_files"], list):
-                for df_path in item["front_matter"]["data_files"]:
-                    page_data.update(_load_json_file_from_assets(df_path, config))
-                    data_json_urls.append(url(df_path, config))
+            output_relative_path = os.path.join(config["collections"][collection_name]["output"], os.path.basename(item["path"]))
+            tasks.append({
+                "kind": "item",
+                "collection": collection_name,
+                "index": index,
+                "source_path": item["path"],
+                "output_relative_path": output_relative_path,
+                "output_path": os.path.join(config["output_dir"], output_relative_path),
+            })
+    return tasks
 
-            try:
-                # For collection items, we load the specified layout template (e.g., post.html)
-                template_obj = env.get_template(layout_name)
-            except Exception as e:
-                logger.error(f"Error loading layout template '{layout_name}' for collection item '{page_source_path}': {e}. Skipping item.")
-                continue
-
-            context = {
-                "page": {
-                    "front_matter": item["front_matter"],
-                    "data": page_data, # Make page-specific data available for server-side rendering
-                    "data_json_urls": data_json_urls, # Pass URLs to the template for client-side fetching
-                    "content": item["content"], # Explicitly pass content for collection items
-                    "url": url(output_relative_path, config),
-                    "canonical": f"{config['base_url']}/{output_relative_path.lstrip('/')}",
-                    "absolute_final_url": url(output_relative_path, config)
-                },
-                "site": env.globals["site"]
-            }
+def _page_context(env, config, front_matter, page_data, data_json_urls, output_relative_path, **page_fields):
+    """The template context of a page or collection item; 'page_fields' are added to 'page'."""
+    page = {
+        "front_matter": front_matter,
+        "data": page_data, # Make page-specific data available for server-side rendering
+        "data_json_urls": data_json_urls, # Pass URLs to the template for client-side fetching
+        "url": url(output_relative_path, config),
+        "canonical": f"{config['base_url']}/{output_relative_path.lstrip('/')}",
+        "absolute_final_url": url(output_relative_path, config)
+    }
+    page.update(page_fields)
+    return {"page": page, "site": env.globals["site"]}
 
-            page_info = _render_and_save_output(env, config, template_obj, context, output_path, page_source_path, content_for_sitemap_rss=item["content"])
-            if page_info:
-                rendered_pages_info.append(page_info)
-            run_hook("after_render_page", page_path=page_source_path, output_path=output_path, config=config)
-    
+def _render_page(env, config, task):
+    """Renders one page from pages_dir. Returns (page_info, dependency_files) or None."""
+    page_source_path = task["source_path"]
+    output_relative_path = task["output_relative_path"]
+    output_path = task["output_path"]
+
+    if has_hook("before_render_page"):
+        run_hook("before_render_page", page_path=page_source_path, config=config)
+
+    with open(page_source_path, 'r', encoding='utf-8') as f:
+        full_file_content = f.read()
+    front_matter, body_content_after_fm = parse_front_matter(full_file_content)
+
+    page_data, data_json_urls = _load_page_data(front_matter, config)
+
+    try:
+        # For pages in 'pages_dir', the content after front matter is the template itself
+        # that extends a base layout (e.g., base.html).
+        template_obj = env.from_string(body_content_after_fm)
+        template_references = env.last_references
+    except Exception as e:
+        logger.error(f"Error creating template from string for page '{page_source_path}': {e}. Ensure it has `{{% extends \"base.html\" %}}` and valid Jinja2 syntax.")
+        return None # Skip this page if template cannot be created
+
+    context = _page_context(env, config, front_matter, page_data, data_json_urls, output_relative_path)
+    page_info = _render_and_save_output(env, config, template_obj, context, output_path, page_source_path, content_for_sitemap_rss=body_content_after_fm)
+    if has_hook("after_render_page"):
+        run_hook("after_render_page", page_path=page_source_path, output_path=output_path, config=config)
+    if not page_info:
+        return None
+    return page_info, _page_data_file_paths(front_matter, config) + template_dependency_files(env, template_references, config)
+
+def _render_collection_item(env, config, collections_data, task):
+    """Renders one collection item with its layout. Returns (page_info, dependency_files) or None."""
+    item = collections_data[task["collection"]][task["index"]]
+    page_source_path = task["source_path"]
+    output_relative_path = task["output_relative_path"]
+    output_path = task["output_path"]
+
+    if has_hook("before_render_page"):
+        run_hook("before_render_page", page_path=page_source_path, config=config)
+
+    layout_name = item["front_matter"].get("layout")
+    if not layout_name:
+        logger.warning(f"Collection item '{page_source_path}' has no 'layout' specified in front matter. Skipping.")
+        return None
+
+    # Collection items can also have page-specific data files from assets
+    page_data, data_json_urls = _load_page_data(item["front_matter"], config)
+
+    try:
+        # For collection items, we load the specified layout template (e.g., post.html)
+        template_obj = env.get_template(layout_name)
+    except Exception as e:
+        logger.error(f"Error loading layout template '{layout_name}' for collection item '{page_source_path}': {e}. Skipping item.")
+        return None
+
+    # Explicitly pass content for collection items
+    context = _page_context(env, config, item["front_matter"], page_data, data_json_urls, output_relative_path,
+                            content=item["content"])
+
+    # item.get() leaves the body of lazy collection items unloaded (None) in the page info.
+    page_info = _render_and_save_output(env, config, template_obj, context, output_path, page_source_path, content_for_sitemap_rss=item.get("content"))
+    if has_hook("after_render_page"):
+        run_hook("after_render_page", page_path=page_source_path, output_path=output_path, config=config)
+    if not page_info:
+        return None
+    return page_info, _page_data_file_paths(item["front_matter"], config) + template_dependency_files(env, [layout_name], config)
+
+def _render_task(env, config, collections_data, task):
+    """Renders a task from _collect_render_tasks. Returns (page_info, dependency_files, site_keys, seconds) or None."""
+    started = time.perf_counter()
+    if env.site_access:
+        env.site_access.start()
+    with tracer.span("render " + task["output_relative_path"], "render", source=task["source_path"]):
+        if task["kind"] == "page":
+            result = _render_page(env, config, task)
+        else:
+            result = _render_collection_item(env, config, collections_data, task)
+    if not result:
+        return None
+    return result + (env.site_access.take() if env.site_access else None, time.perf_counter() - started)
+
+def _template_files(dependency_files, config):
+    """The files from templates_dir among a page's dependency files."""
+    return [path for path in dependency_files if _is_under(os.path.abspath(path), config["templates_dir"])]
+
+# Per-process state of a render worker, set up once by _init_render_worker.
+_worker_state = {}
+
+def _init_render_worker(config, site_data, collections_data, trace=False):
+    """Process pool initializer: sets up the worker's own Jinja2 environment (and trace) once."""
+    if trace:
+        tracer.start(worker=f"worker-{os.getpid()}")
+    else:
+        tracer.stop() # A forked worker must not keep recording into the parent's copied trace
+    memory_profiler.discard() # Nor pay for allocation tracing inherited from a profiled parent
+    if not plugin_system.PLUGINS:
+        # Worker processes that were spawned (not forked) start without plugins.
+        with tracer.span("load plugins", "stage"):
+            load_plugins(config)
+    asset_json_cache.take_stats() # Counters inherited from a forked parent are not ours to report
+    plugin_system.take_hook_stats()
+    _worker_state["config"] = config
+    _worker_state["collections_data"] = collections_data
+    _worker_state["env"] = setup_jinja_environment(config, site_data, collections_data)
+
+def _render_task_in_worker(task):
+    """Process pool entry point: returns (result, cache stats, hook stats, trace events) of one task."""
+    result = _render_task(_worker_state["env"], _worker_state["config"], _worker_state["collections_data"], task)
+    return result, asset_json_cache.take_stats(), plugin_system.take_hook_stats(), tracer.take_events()
+
+def resolve_jobs(config, jobs=None):
+    """Number of render processes: the jobs argument, else config "jobs", else 1; 0 or less means one per CPU."""
+    if jobs is None:
+        jobs = config.get("jobs", 1)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return jobs
+
+def _render_tasks(config, site_data, collections_data, tasks, jobs, env=None, start_method=None):
+    """Renders tasks serially (reusing 'env' if given) or across 'jobs' worker processes, in task order."""
+    if jobs <= 1 or len(tasks) < 2:
+        if env is None:
+            env = setup_jinja_environment(config, site_data, collections_data)
+        env.compiled_cache_hits = env.compiled_cache_misses = 0
+        results = [_render_task(env, config, collections_data, task) for task in tasks]
+        if env.compiled_cache_dir:
+            logger.info("Compiled template cache: %d hit(s), %d miss(es)", env.compiled_cache_hits, env.compiled_cache_misses)
+        return results
+
+    jobs = min(jobs, len(tasks))
+    logger.info("Rendering %d page(s) with %d worker processes", len(tasks), jobs)
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    mp_context = None
+    if start_method:
+        import multiprocessing
+        mp_context = multiprocessing.get_context(start_method)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context, initializer=_init_render_worker,
+                             initargs=(config, site_data, collections_data, tracer.enabled)) as executor:
+        # Executor.map yields results in submission order, which keeps the output deterministic.
+        results = []
+        for result, cache_stats, hook_stats, trace_events in executor.map(_render_task_in_worker, tasks, chunksize=chunksize):
+            results.append(result)
+            asset_json_cache.add_stats(cache_stats)
+            plugin_system.add_hook_stats(hook_stats)
+            tracer.add_events(trace_events)
+        return results
+
+def render_all_content(config, site_data, collections_data, manifest=None, jobs=1, env=None, timer=None, start_method=None):
+    """Renders all pages and collection items, skipping outputs the manifest says are still valid."""
+    tasks = _collect_render_tasks(config, collections_data)
+    tracking = config.get("track_site_access", False)
+    deps_hash = None
+    if manifest:
+        deps_hash = _page_dependency_hashes(config, site_data, collections_data, manifest,
+                                            set() if tracking else _listing_pages(config))
+    site_hashes = site_access_hashes(site_data, collections_data, manifest) if manifest and tracking else {}
+
+    results = [None] * len(tasks)
+    pending = []
+    for position, task in enumerate(tasks):
+        if manifest and manifest.is_fresh(task["output_path"], task["source_path"], deps_hash(task["source_path"]), site_hashes):
+            # Regular page bodies are not kept in the manifest, so their 'content' is None here.
+            content = collections_data[task["collection"]][task["index"]].get("content") if task["kind"] == "item" else None
+            results[position] = _reuse_page_info(manifest, task["output_path"], content)
+        else:
+            pending.append(position)
+
+    pending_tasks = [tasks[p] for p in pending]
+    if timer:
+        timer.kept_pages = len(tasks) - len(pending)
+    run_hook("before_render_pages", pages=pending_tasks, config=config)
+    rendered = _render_tasks(config, site_data, collections_data, pending_tasks, jobs, env=env, start_method=start_method)
+    for position, result in zip(pending, rendered):
+        if not result:
+            continue
+        page_info, dependency_files, site_keys, seconds = result
+        results[position] = page_info
+        if timer:
+            timer.add_page(page_info["source_path"], page_info["output_path"], seconds, _template_files(dependency_files, config))
+        if manifest:
+            page_info["lastmod"] = _source_lastmod(manifest, page_info["source_path"])
+            manifest.record(page_info["output_path"], page_info["source_path"], deps_hash(page_info["source_path"]),
+                            info=_manifest_page_info(page_info), extra_files=dependency_files,
+                            site_access=_site_access_record(site_keys, site_hashes))
+
+    rendered_pages_info = [page_info for page_info in results if page_info] # Info for sitemap/RSS
+    run_hook("after_render_pages", rendered_pages_info=rendered_pages_info, config=config)
     return rendered_pages_info
 
 
-def copy_static(config):
+def copy_static(config, manifest=None):
     """Copies static files from 'static_dir' to the 'output_dir/static'."""
     run_hook("before_copy_static", config=config)
-    logger.info("Copying static files from %s to %s", config["static_dir"], os.path.join(config["output_dir"], "static"))
+    destination_dir = os.path.join(config["output_dir"], "static")
+    logger.info("Copying static files from %s to %s", config["static_dir"], destination_dir)
+    stats = None
     if os.path.exists(config["static_dir"]):
-        shutil.copytree(config["static_dir"], os.path.join(config["output_dir"], "static"), dirs_exist_ok=True)
+        if config.get("copy_mode", "sync") == "sync":
+            # output_dir/static belongs to static_dir alone, so stale files can be pruned directly.
+            stats = sync_tree(config["static_dir"], destination_dir, manifest, prune=True)
+            log_sync_stats("Static files", stats)
+        else:
+            copy_tree(config["static_dir"], destination_dir, manifest)
     else:
         logger.warning("Static directory not found: %s. Skipping static file copy.", config["static_dir"])
     run_hook("after_copy_static", config=config)
+    return stats
 
-def copy_assets(config):
+def copy_assets(config, manifest=None):
     """Copies assets from 'assets_dir' directly to the 'output_dir'."""
     run_hook("before_copy_assets", config=config)
     logger.info("Copying assets from %s to %s", config["assets_dir"], config["output_dir"])
+    stats = None
     if os.path.exists(config["assets_dir"]):
-        shutil.copytree(config["assets_dir"], config["output_dir"], dirs_exist_ok=True)
+        if config.get("copy_mode", "sync") == "sync":
+            stats = sync_tree(config["assets_dir"], config["output_dir"], manifest)
+            log_sync_stats("Assets", stats)
+        else:
+            copy_tree(config["assets_dir"], config["output_dir"], manifest)
     else:
         logger.warning("Assets directory not found: %s. Skipping asset copy.", config["assets_dir"])
     run_hook("after_copy_assets", config=config)
+    return stats
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+# Limits of a single sitemap file set by the sitemaps protocol.
+SITEMAP_MAX_URLS = 50000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+# Generous upper bound for the markup around one <url> entry, used when planning shards.
+_SITEMAP_ENTRY_OVERHEAD = 128
+
+def _plan_sitemap_shards(config, rendered_pages_info):
+    """Splits the page list into (start, end) ranges that each fit in one sitemap file."""
+    max_urls = config.get("sitemap_max_urls", SITEMAP_MAX_URLS)
+    max_bytes = config.get("sitemap_max_bytes", SITEMAP_MAX_BYTES) - 2 * _SITEMAP_ENTRY_OVERHEAD # header/footer
+    shards = []
+    start = 0
+    shard_bytes = 0
+    for index, page in enumerate(rendered_pages_info):
+        entry_bytes = len(xml_escape(page['url']).encode('utf-8')) + _SITEMAP_ENTRY_OVERHEAD
+        if index > start and (index - start >= max_urls or shard_bytes + entry_bytes > max_bytes):
+            shards.append((start, index))
+            start, shard_bytes = index, 0
+        shard_bytes += entry_bytes
+    if start < len(rendered_pages_info) or not shards:
+        shards.append((start, len(rendered_pages_info)))
+    return shards
+
+def _write_sitemap_file(config, sitemap_path, pages):
+    """Streams one <urlset> sitemap file with a <loc> (and <lastmod>, if known) per page."""
+    with _open_output_file(sitemap_path) as f:
+        writer = StreamingXMLWriter(f, pretty=config.get("pretty_xml", True))
+        writer.declaration()
+        writer.start('urlset', {"xmlns": SITEMAP_NAMESPACE})
+        for page in pages:
+            writer.start('url')
+            writer.element('loc', page['url'])
+            if page.get('lastmod'):
+                writer.element('lastmod', page['lastmod'])
+            writer.end('url')
+        writer.end('urlset')
+        writer.close()
+    return sitemap_path
+
+def _remove_stale_sitemap_shards(output_dir, shard_count):
+    """Deletes sitemap-N.xml files left over from a previous build that had more shards."""
+    for file_name in os.listdir(output_dir):
+        match = re.fullmatch(r"sitemap-(\d+)\.xml", file_name)
+        if match and (shard_count == 1 or int(match.group(1)) > shard_count):
+            os.remove(os.path.join(output_dir, file_name))
 
 def generate_sitemap(config, rendered_pages_info):
-    """Generates a sitemap.xml file."""
+    """Generates a sitemap.xml file, split into shards behind a sitemap index when too large."""
     run_hook("before_generate_sitemap", config=config, pages=rendered_pages_info)
     logger.info("Generating sitemap.xml")
-    
-    urlset = Element('urlset', xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
-
-    for page in rendered_pages_info:
-        loc = SubElement(urlset, 'url')
-        SubElement(loc, 'loc').text = page['url']
-        # Add lastmod if available (e.g., from front matter or file modification time)
-        # For now, we'll just add basic URL
-        
+
     sitemap_path = os.path.join(config["output_dir"], "sitemap.xml")
-    # Pretty print XML
-    rough_string = tostring(urlset, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    pretty_xml = reparsed.toprettyxml(indent="  ")
+    shards = _plan_sitemap_shards(config, rendered_pages_info)
+    _remove_stale_sitemap_shards(config["output_dir"], len(shards))
+    if len(shards) == 1:
+        _write_sitemap_file(config, sitemap_path, rendered_pages_info)
+    else:
+        shard_paths = [os.path.join(config["output_dir"], f"sitemap-{n}.xml") for n in range(1, len(shards) + 1)]
+        for shard_path, (start, end) in zip(shard_paths, shards):
+            _write_sitemap_file(config, shard_path, itertools.islice(rendered_pages_info, start, end))
+
+        build_time = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+        with _open_output_file(sitemap_path) as f:
+            writer = StreamingXMLWriter(f, pretty=config.get("pretty_xml", True))
+            writer.declaration()
+            writer.start('sitemapindex', {"xmlns": SITEMAP_NAMESPACE})
+            for shard_path in shard_paths:
+                writer.start('sitemap')
+                writer.element('loc', f"{config['base_url']}/{os.path.basename(shard_path)}")
+                writer.element('lastmod', build_time)
+                writer.end('sitemap')
+            writer.end('sitemapindex')
+            writer.close()
+        logger.info("Sitemap split into %d files (sitemap-1.xml ... sitemap-%d.xml)", len(shards), len(shards))
 
-    with open(sitemap_path, 'w', encoding='utf-8') as f:
-        f.write(pretty_xml)
     logger.info("Sitemap generated at: %s", sitemap_path)
     run_hook("after_generate_sitemap", config=config, sitemap_path=sitemap_path)
 
+RSS_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S +0000"
+
 def generate_rss_feed(config, collections_data):
-    """Generates an RSS feed (e.g., for blog posts)."""
+    """Generates an RSS feed of the newest items of a collection (e.g., blog posts)."""
     run_hook("before_generate_rss_feed", config=config, collections=collections_data)
-    logger.info("Generating RSS feed. Looking for 'posts' collection.")
+    collection_name = config.get("rss_collection", "posts")
+    logger.info("Generating RSS feed. Looking for '%s' collection.", collection_name)
 
-    posts = collections_data.get("posts", []) # Assuming 'posts' is a collection
+    posts = collections_data.get(collection_name, [])
     if not posts:
-        logger.info("No 'posts' collection found for RSS feed generation. Skipping.")
+        logger.info("No '%s' collection found for RSS feed generation. Skipping.", collection_name)
         return
 
-    # Sort posts by date (assuming 'date' in front matter)
-    # Convert string dates to datetime objects for proper sorting
-    for post in posts:
-        date_str = post['front_matter'].get('date')
-        if date_str and isinstance(date_str, str):
-            try:
-                post['front_matter']['_date_obj'] = datetime.datetime.strptime(date_str, "%Y-%m-%d")
-            except ValueError:
-                logger.warning(f"Could not parse date '{date_str}' for post: {post['url']}. Using default.")
-                post['front_matter']['_date_obj'] = datetime.datetime.min # Use a very old date for unparseable dates
-
-    posts_sorted = sorted(posts, key=lambda x: x['front_matter'].get('_date_obj', datetime.datetime.min), reverse=True)
-    
-    rss = Element('rss', version="2.0", attrib={'xmlns:atom': 'http://www.w3.org/2005/Atom'})
-    channel = SubElement(rss, 'channel')
-    
-    SubElement(channel, 'title').text = config.get("site_title", "My Static Site")
-    SubElement(channel, 'link').text = config["base_url"]
-    SubElement(channel, 'description').text = config.get("site_description", "A static site generated with Python.")
-    SubElement(channel, 'lastBuildDate').text = datetime.datetime.now().strftime("%a, %d %b %Y %H:%M:%S +0000")
-    
-    atom_link = SubElement(channel, 'atom:link', href=f"{config['base_url']}/feed.xml", rel="self", type="application/rss+xml")
-
-    # Limit to, say, 10 most recent posts
-    for post in posts_sorted[:10]:
-        item = SubElement(channel, 'item')
-        SubElement(item, 'title').text = post['front_matter'].get('title', 'No Title')
-        SubElement(item, 'link').text = post['url']
-        SubElement(item, 'guid').text = post['url'] # GUID is usually the URL
-        
-        pub_date_obj = post['front_matter'].get('_date_obj')
-        if pub_date_obj and isinstance(pub_date_obj, datetime.datetime):
-            SubElement(item, 'pubDate').text = pub_date_obj.strftime("%a, %d %b %Y %H:%M:%S +0000")
-        else:
-            logger.warning(f"No valid date object for RSS item: {post['url']}")
-        
-        # Description can be a summary or a portion of the content
-        description = SubElement(item, 'description')
-        description.text = post['front_matter'].get('description', post['content'][:200] + "..." if len(post['content']) > 200 else post['content'])
+    newest_posts = heapq.nlargest(config.get("rss_limit", 10), posts, key=lambda post: post['date'])
 
     rss_path = os.path.join(config["output_dir"], "feed.xml")
-    rough_string = tostring(rss, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    pretty_xml = reparsed.toprettyxml(indent="  ")
+    with _open_output_file(rss_path) as f:
+        writer = StreamingXMLWriter(f, pretty=config.get("pretty_xml", True))
+        writer.declaration()
+        writer.start('rss', {"version": "2.0", "xmlns:atom": "http://www.w3.org/2005/Atom"})
+        writer.start('channel')
+        writer.element('title', config.get("site_title", "My Static Site"))
+        writer.element('link', config["base_url"])
+        writer.element('description', config.get("site_description", "A static site generated with Python."))
+        writer.element('lastBuildDate', datetime.datetime.now().strftime(RSS_DATE_FORMAT))
+        writer.element('atom:link', attrs={"href": f"{config['base_url']}/feed.xml", "rel": "self", "type": "application/rss+xml"})
+
+        for post in newest_posts:
+            writer.start('item')
+            writer.element('title', post['front_matter'].get('title', 'No Title'))
+            writer.element('link', post['url'])
+            writer.element('guid', post['url']) # GUID is usually the URL
+
+            if post['date'] != datetime.datetime.min:
+                writer.element('pubDate', post['date'].strftime(RSS_DATE_FORMAT))
+            else:
+                logger.warning(f"No valid date for RSS item: {post['url']}")
+
+            # Description can be a summary or a portion of the content
+            writer.element('description', post['front_matter'].get('description', post['content'][:200] + "..." if len(post['content']) > 200 else post['content']))
+            writer.end('item')
+
+        writer.end('channel')
+        writer.end('rss')
+        writer.close()
 
-    with open(rss_path, 'w', encoding='utf-8') as f:
-        f.write(pretty_xml)
     logger.info("RSS feed generated at: %s", rss_path)
     run_hook("after_generate_rss_feed", config=config, rss_path=rss_path)
 
 
-def build_command(config_path):
-    """Builds the static site."""
-    config = load_config(config_path)
-    config["config_path"] = config_path # Store config_path for relative lookups
-    
-    # Initialize plugins (populates the global PLUGINS list in plugin_system.py)
-    load_plugins(config) 
-    run_hook("before_build", config=config)
+# --- Targeted rebuilds (watch mode) ---
+
+def _is_under(path, directory):
+    """True if absolute 'path' is 'directory' itself or inside it."""
+    directory = os.path.abspath(directory)
+    return path == directory or path.startswith(directory + os.sep)
+
+def _config_relative(path, directory):
+    """Converts an absolute path under 'directory' into the form os.walk(directory) produces."""
+    relative_path = os.path.relpath(path, os.path.abspath(directory))
+    return directory if relative_path == "." else os.path.join(directory, relative_path)
+
+def _classify_changes(config, changed_paths):
+    """Groups changed paths by the build step they affect, or returns None if they need a full build."""
+    plan = {"static": set(), "assets": set(), "pages": set(), "templates": set(), "collections": {}}
+    full_build_dirs = [config.get("data_dir"), config.get("plugins_dir")]
+    for changed_path in changed_paths:
+        path = os.path.abspath(changed_path)
+        if path == os.path.abspath(config["config_path"]):
+            return None
+        if any(d and _is_under(path, d) for d in full_build_dirs):
+            return None
+        if _is_under(path, config["output_dir"]):
+            continue
+        for collection_name, collection_settings in config.get("collections", {}).items():
+            if collection_settings.get("path") and _is_under(path, collection_settings["path"]):
+                plan["collections"].setdefault(collection_name, set()).add(_config_relative(path, collection_settings["path"]))
+                break
+        else:
+            for key, directory_key in (("templates", "templates_dir"), ("pages", "pages_dir"),
+                                       ("static", "static_dir"), ("assets", "assets_dir")):
+                if _is_under(path, config[directory_key]):
+                    plan[key].add(_config_relative(path, config[directory_key]))
+                    break
+    return plan
+
+def _sync_changed_path(source_root, destination_root, source_path, manifest, prune):
+    """Brings the copy of one changed file or directory from 'source_root' up to date."""
+    destination_path = os.path.normpath(os.path.join(destination_root, os.path.relpath(source_path, source_root)))
+    if os.path.isdir(source_path):
+        log_sync_stats(source_path, sync_tree(source_path, destination_path, manifest, prune=prune))
+    elif os.path.isfile(source_path):
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        copy_file(source_path, destination_path)
+        manifest.record_copy(destination_path, source_path)
+        logger.info("Copied: %s -> %s", source_path, destination_path)
+    elif os.path.isfile(destination_path):
+        os.remove(destination_path)
+        manifest.drop(destination_path)
+        logger.info("Removed: %s", destination_path)
+    elif os.path.isdir(destination_path) and prune:
+        shutil.rmtree(destination_path)
+        logger.info("Removed: %s", destination_path)
 
-    if os.path.exists(config["output_dir"]):
-        logger.info("Clearing output directory: %s", config["output_dir"])
-        shutil.rmtree(config["output_dir"])
-    os.makedirs(config["output_dir"])
+def _mentions_collections(path):
+    """True if a page or template source mentions 'collections' (cheap text scan)."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return "collections" in f.read()
 
-    site_data = load_data_files(config)
-    collections_data = load_collections(config)
+def _layouts_use_collections(config):
+    """True if any file in templates_dir mentions 'collections'."""
+    for root, _, files in os.walk(config["templates_dir"]):
+        if any(_mentions_collections(os.path.join(root, file_name)) for file_name in files):
+            return True
+    return False
 
-    rendered_pages_info = render_all_content(config, site_data, collections_data)
-    copy_static(config)
-    copy_assets(config) 
-    generate_sitemap(config, rendered_pages_info)
-    generate_rss_feed(config, collections_data)
+def _find_listing_pages(config):
+    """Regular pages whose source mentions 'collections'."""
+    listing_pages = set()
+    for root, _, files in os.walk(config["pages_dir"]):
+        for page_file in files:
+            page_path = os.path.join(root, page_file)
+            if _mentions_collections(page_path):
+                listing_pages.add(page_path)
+    return listing_pages
+
+def _listing_pages(config):
+    """Pages whose output depends on the collections, or None when the layouts make every page do so."""
+    return None if _layouts_use_collections(config) else _find_listing_pages(config)
+
+def _refresh_collection(config, collection_name, changed_paths, collections_data):
+    """Reloads the changed items of one collection, keeping the load order of a full build."""
+    collection_settings = config["collections"][collection_name]
+    existing = {item["path"]: item for item in collections_data.get(collection_name, [])}
+    items = []
+    for file_path in collection_file_paths(collection_settings["path"]):
+        if file_path in changed_paths or file_path not in existing:
+            items.append(load_collection_item(config, collection_name, collection_settings, file_path))
+        else:
+            items.append(existing[file_path])
+    # Update the list in place: the Jinja environment's 'site' global refers to it.
+    collections_data.setdefault(collection_name, [])[:] = items
+
+def _stat_signature(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
-    logger.info("Static site generation complete. Files are in %s", config["output_dir"])
-    run_hook("after_build", config=config)
+def _tree_signature(directory):
+    """Sorted (path, mtime_ns, size) of every file under 'directory' (stat only, no reads)."""
+    if not directory or not os.path.exists(directory):
+        return []
+    entries = []
+    for root, _, files in os.walk(directory):
+        for file_name in files:
+            file_path = os.path.join(root, file_name)
+            entries.append((file_path, _stat_signature(file_path)))
+    return sorted(entries)
 
+# --- Warm site ---
+
+class Site:
+    """A site kept loaded between builds, refreshing only what changed on disk (see README, "Warm site object")."""
+
+    def __init__(self, config_path, start_method=None):
+        self.config_path = config_path
+        self.start_method = start_method # multiprocessing start method of render workers (default: the platform's)
+        self.config = None
+        self.site_data = None
+        self.collections_data = None
+        self.manifest = None
+        self.env = None
+        self._config_signature = None
+        self._plugins_signature = None
+        self._data_signature = None
+        self._collection_signatures = {}
+        self._listing_pages = None
+        self._layouts_use_collections = None
+        self.last_report = None # Timing report of the last build (see build_report)
+
+    # -- Refreshing the warm state --
+
+    def _refresh_config(self):
+        """Reloads the config if its file changed. Returns True if it was (re)loaded."""
+        signature = _stat_signature(self.config_path)
+        if self.config is not None and signature == self._config_signature:
+            return False
+        self.config = load_config(self.config_path)
+        self.config["config_path"] = self.config_path # Store config_path for relative lookups
+        self._config_signature = signature
+        asset_json_cache.reset(max_bytes=self.config.get("asset_json_cache_mb", 256) * 1024 * 1024)
+        return True
+
+    def _refresh_plugins(self, config_changed):
+        """Loads plugins (populates the global PLUGINS list in plugin_system.py) if they changed."""
+        signature = _tree_signature(self.config.get("plugins_dir"))
+        if config_changed or signature != self._plugins_signature:
+            load_plugins(self.config)
+            self._plugins_signature = signature
+
+    def _refresh_data(self, config_changed):
+        """Reloads site data if any file in data_dir changed. Returns True if it was (re)loaded."""
+        signature = _tree_signature(self.config.get("data_dir"))
+        if not config_changed and self.site_data is not None and signature == self._data_signature:
+            return False
+        self.site_data = load_data_files(self.config)
+        self._data_signature = signature
+        return True
+
+    def _refresh_collections(self, config_changed):
+        """Reloads new and changed collection items, keeping unchanged ones. Returns True if any changed."""
+        if config_changed or self.collections_data is None:
+            self.collections_data = load_collections(self.config)
+            self._collection_signatures = {
+                item["path"]: _stat_signature(item["path"])
+                for items in self.collections_data.values() for item in items
+            }
+            return True
+        changed = False
+        for collection_name, items in self.collections_data.items():
+            loaded_paths = [item["path"] for item in items]
+            current_paths = list(collection_file_paths(self.config["collections"][collection_name]["path"]))
+            changed_paths = {p for p in current_paths if _stat_signature(p) != self._collection_signatures.get(p)}
+            if changed_paths or current_paths != loaded_paths:
+                _refresh_collection(self.config, collection_name, changed_paths, self.collections_data)
+                changed = True
+            for path in changed_paths:
+                self._collection_signatures[path] = _stat_signature(path)
+        return changed
+
+    def _environment(self):
+        """The warm Jinja2 environment, created on first use."""
+        if self.env is None:
+            self.env = setup_jinja_environment(self.config, self.site_data, self.collections_data)
+        return self.env
+
+    def _load_manifest(self, clean):
+        """The manifest for the next build: the in-memory one when possible, else the one on disk."""
+        if clean or not self.config.get("incremental", True):
+            return BuildManifest(os.path.join(get_cache_dir(self.config), MANIFEST_FILE_NAME), output_dir=self.config["output_dir"])
+        if self.manifest is not None and os.path.exists(self.manifest.path):
+            # A missing manifest file means someone (e.g. 'rollback') asked for a full build.
+            manifest = self.manifest.successor()
+            manifest.output_dir = self.config["output_dir"]
+            return manifest
+        return BuildManifest.load(self.config)
+
+    # -- Builds --
+
+    def build(self, clean=False, jobs=None):
+        """Builds the static site, incrementally unless clean=True or "incremental": false."""
+        timer = BuildTimer()
+        with timer.stage("config"):
+            config_changed = self._refresh_config()
+        config = self.config
+        with timer.stage("plugins"):
+            self._refresh_plugins(config_changed)
+            plugin_system.take_hook_stats() # Hook statistics are reported per build
+            run_hook("before_build", config=config)
+
+        with timer.stage("manifest"):
+            manifest = self._load_manifest(clean)
+            self.manifest = None # Not trusted again until this build completes
+            full_build = clean or not config.get("incremental", True) or not manifest.previous_outputs
+            if full_build:
+                # Without a previous manifest we cannot tell which files in output_dir are ours.
+                manifest = BuildManifest(manifest.path, output_dir=config["output_dir"])
+
+        stage = None
+        published_output_dir = config["output_dir"]
+        with timer.stage("prepare output"):
+            if config.get("staged_output"):
+                stage = OutputStage(published_output_dir, keep_builds=config.get("keep_builds", 2))
+                # Everything below (including plugin hooks) writes into the staging directory.
+                config["output_dir"] = stage.prepare(clean=full_build)
+                manifest.output_dir = config["output_dir"]
+            elif full_build and os.path.islink(config["output_dir"]):
+                # Left over from staged builds; the builds themselves stay in '<output_dir>.builds'.
+                os.unlink(config["output_dir"])
+            elif full_build and os.path.exists(config["output_dir"]):
+                logger.info("Clearing output directory: %s", config["output_dir"])
+                shutil.rmtree(config["output_dir"])
+            os.makedirs(config["output_dir"], exist_ok=True)
+        asset_json_cache.take_stats() # Cached entries stay valid across builds; counters are per build
+        jobs = resolve_jobs(config, jobs)
+
+        try:
+            with timer.stage("data"):
+                data_changed = self._refresh_data(config_changed)
+            with timer.stage("collections"):
+                collections_changed = self._refresh_collections(config_changed)
+            if config_changed or data_changed:
+                self.env = None
+            if config_changed or data_changed or collections_changed:
+                self._listing_pages = self._layouts_use_collections = None
+
+            with timer.stage("render"):
+                rendered_pages_info = render_all_content(config, self.site_data, self.collections_data, manifest,
+                                                         jobs=jobs, env=self._environment(), timer=timer,
+                                                         start_method=self.start_method)
+            with timer.stage("static"):
+                copy_static(config, manifest)
+            with timer.stage("assets"):
+                copy_assets(config, manifest)
+            with timer.stage("stale outputs"):
+                manifest.remove_stale_outputs(config["output_dir"])
+            with timer.stage("sitemap"):
+                generate_sitemap(config, rendered_pages_info)
+            with timer.stage("rss"):
+                generate_rss_feed(config, self.collections_data)
+            memory_profiler.measure(collections_data=self.collections_data, site_data=self.site_data,
+                                    rendered_pages_info=rendered_pages_info, manifest_outputs=manifest.outputs)
+        except BaseException:
+            if stage:
+                logger.error("Build failed. Discarding staged build %s", stage.build_dir)
+                stage.discard()
+                config["output_dir"] = published_output_dir
+            raise
+
+        with timer.stage("publish"):
+            if stage:
+                stage.publish()
+                config["output_dir"] = published_output_dir
+                manifest.output_dir = published_output_dir
+            manifest.save()
+            manifest.advance()
+        with timer.stage("template cache"):
+            _prune_template_cache(config)
+        self.manifest = manifest
+        # Pages and layouts may have changed since the caches for targeted rebuilds were filled.
+        self._listing_pages = self._layouts_use_collections = None
+
+        logger.info("Asset JSON cache: %(hits)d hit(s), %(misses)d miss(es), %(evictions)d eviction(s)", asset_json_cache.stats())
+        logger.info("Static site generation complete. Files are in %s", config["output_dir"])
+        with timer.stage("after_build"):
+            run_hook("after_build", config=config)
+        hook_stats = plugin_system.take_hook_stats()
+        plugin_system.log_hook_stats(hook_stats)
+        timer.log_summary(top=config.get("report_top", 10))
+        self.last_report = timer.report(
+            full_build=full_build,
+            jobs=jobs,
+            asset_json_cache=asset_json_cache.stats(),
+            plugin_hooks=[{"plugin": plugin_name, "hook": hook_name, "calls": calls, "seconds": seconds}
+                          for plugin_name, hook_name, calls, seconds in hook_stats],
+        )
+        write_report(self.last_report, get_report_path(config))
+
+    def update(self, changed_paths):
+        """Applies changed source paths with a targeted rebuild if possible, else a build. Returns True if targeted."""
+        if self.manifest is not None:
+            try:
+                if self.rebuild_changed_paths(changed_paths):
+                    return True
+            except Exception as e:
+                logger.error(f"Targeted rebuild failed, falling back to a full build: {e}")
+                self.manifest = None # Its in-memory records may be half-updated
+        self.build()
+        return False
+
+    def rebuild_changed_paths(self, changed_paths):
+        """Applies changed source paths with the smallest set of build steps. Returns False if a full build is needed."""
+        config = self.config
+        if config.get("staged_output"):
+            return False
+        plan = _classify_changes(config, changed_paths)
+        if plan is None:
+            return False
+        if plan["templates"]:
+            self._layouts_use_collections = None
+        tracking = config.get("track_site_access", False)
+        if not tracking and self._layouts_use_collections is None:
+            self._layouts_use_collections = _layouts_use_collections(config)
+        if plan["collections"] and not tracking and self._layouts_use_collections:
+            return False
+
+        manifest = self.manifest
+        collections_data = self.collections_data
+        all_changed = set(plan["static"]) | plan["assets"] | plan["pages"] | plan["templates"]
+        for paths in plan["collections"].values():
+            all_changed |= paths
+        manifest.forget(all_changed)
+
+        for path in sorted(plan["static"]):
+            _sync_changed_path(config["static_dir"], os.path.join(config["output_dir"], "static"), path, manifest, prune=True)
+        for path in sorted(plan["assets"]):
+            _sync_changed_path(config["assets_dir"], config["output_dir"], path, manifest, prune=False)
+
+        if self._listing_pages is None:
+            self._listing_pages = _find_listing_pages(config)
+
+        # Sources to re-render: changed pages/items, listing pages, pages using a changed data file or template
+        sources_to_render = set(plan["pages"])
+        changed_dependencies = plan["assets"] | plan["templates"] | plan["pages"]
+        for collection_name, paths in plan["collections"].items():
+            _refresh_collection(config, collection_name, paths, collections_data)
+            for path in paths:
+                self._collection_signatures[path] = _stat_signature(path)
+            sources_to_render |= paths
+            if tracking:
+                collection_keys = {f"collections:{collection_name}", f"collections:{ALL_KEYS}"}
+                for entry in manifest.outputs.values():
+                    if entry["deps"] != "copy" and collection_keys & set(entry.get("site", {})):
+                        sources_to_render.add(entry["source"])
+            else:
+                sources_to_render |= self._listing_pages
+        for entry in manifest.outputs.values():
+            if entry["deps"] != "copy" and any(p in changed_dependencies for p in entry.get("extra", {})):
+                sources_to_render.add(entry["source"])
+        for page_path in plan["pages"]:
+            self._listing_pages.discard(page_path)
+            if os.path.isfile(page_path) and _mentions_collections(page_path):
+                self._listing_pages.add(page_path)
+
+        if not sources_to_render:
+            manifest.save()
+            return True
+
+        tasks = _collect_render_tasks(config, collections_data)
+        listing_pages = set() if tracking else None if self._layouts_use_collections else self._listing_pages
+        deps_hash = _page_dependency_hashes(config, self.site_data, collections_data, manifest, listing_pages)
+        site_hashes = site_access_hashes(self.site_data, collections_data, manifest) if tracking else {}
+        env = self._environment()
+        tasks_to_render = [task for task in tasks if task["source_path"] in sources_to_render]
+        run_hook("before_render_pages", pages=tasks_to_render, config=config)
+        for task in tasks_to_render:
+            result = _render_task(env, config, collections_data, task)
+            if result:
+                page_info, dependency_files, site_keys, _ = result
+                page_info["lastmod"] = _source_lastmod(manifest, page_info["source_path"])
+                manifest.record(page_info["output_path"], page_info["source_path"], deps_hash(page_info["source_path"]),
+                                info=_manifest_page_info(page_info), extra_files=dependency_files,
+                                site_access=_site_access_record(site_keys, site_hashes))
+
+        # Outputs of pages and items whose source is gone
+        task_outputs = {manifest.output_key(task["output_path"]) for task in tasks}
+        for key, entry in list(manifest.outputs.items()):
+            if entry["deps"] != "copy" and key not in task_outputs:
+                output_path = os.path.join(config["output_dir"], key)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                    logger.info("Removed: %s", output_path)
+                manifest.drop(output_path)
+
+        rendered_pages_info = []
+        for task in tasks:
+            entry = manifest.current(task["output_path"])
+            if entry and entry["deps"] != "copy":
+                rendered_pages_info.append(dict(entry["info"], output_path=task["output_path"], content=None))
+        run_hook("after_render_pages", rendered_pages_info=rendered_pages_info, config=config)
+        generate_sitemap(config, rendered_pages_info)
+        if plan["collections"]:
+            generate_rss_feed(config, collections_data)
+        manifest.save()
+        _prune_template_cache(config)
+        return True
+
+def build_command(config_path, clean=False, jobs=None, profile=False, trace=False, memory_profile=False):
+    """Builds the static site once (see Site.build), optionally profiled or traced. Returns the warm Site."""
+    site = Site(config_path)
+    if trace:
+        tracer.start()
+    if memory_profile:
+        memory_profiler.start()
+    profiler = cProfile.Profile() if profile else None
+    try:
+        if profiler:
+            profiler.enable()
+        try:
+            site.build(clean=clean, jobs=jobs)
+        finally:
+            if profiler:
+                profiler.disable()
+    finally:
+        if profiler and site.config:
+            profile_path = os.path.normpath(site.config["output_dir"]) + ".prof"
+            profiler.dump_stats(profile_path + ".tmp")
+            os.replace(profile_path + ".tmp", profile_path)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(20)
+            logger.info("Profile written to %s. Top functions by cumulative time:\n%s", profile_path, summary.getvalue())
+        if memory_profile:
+            memory_report = memory_profiler.stop()
+            log_memory_report(memory_report)
+            if site.config:
+                write_memory_report(memory_report, get_memory_report_path(site.config))
+        if trace:
+            trace_events = tracer.stop()
+            if site.config:
+                write_trace(trace_events, get_trace_path(site.config))
+    return site
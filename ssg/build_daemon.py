@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import queue
+import socket
+import logging
+import multiprocessing
+import threading
+import socketserver
+
+from .build_core import Site
+from .daemon_client import get_daemon_socket_path
+
+logger = logging.getLogger(__name__)
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request line, waits for the daemon's answer and writes it back as one line."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"ok": False, "error": f"Invalid request: {e}"}
+        else:
+            response = self.server.daemon.submit(request)
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+        self.wfile.flush()
+        if response.get("command") == "stop" and response.get("ok"):
+            # shutdown() blocks until serve_forever() returns, so it cannot run on this thread.
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class BuildDaemon:
+    """
+    Keeps a warm Site in memory and serves build requests over a Unix domain socket.
+
+    Each connection sends one JSON request line and gets one JSON response line:
+      * {"command": "build", "clean": false, "jobs": null} runs Site.build(),
+      * {"command": "update", "paths": [...]} runs Site.update() for changed paths,
+      * {"command": "status"} answers right away with the queue length and the last build,
+      * {"command": "stop"} stops the daemon once the requests queued before it are done.
+    Builds and updates run one at a time, in arrival order, on a single worker thread.
+    Responses carry "ok", the request's "queued_ms" (time spent waiting for earlier builds)
+    and "duration_ms", plus "error" when the request failed.
+    """
+
+    def __init__(self, config_path, socket_path=None):
+        # Forking render workers from this multithreaded server could copy locks held by other threads.
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.site = Site(config_path, start_method=start_method)
+        self.socket_path = socket_path
+        self._queue = queue.Queue()
+        self._server = None
+        self.started_at = None
+        self.requests_served = 0
+        self.last_build = None
+
+    def submit(self, request):
+        """Queues a request (called from connection threads) and waits for its response."""
+        received = time.perf_counter()
+        if request.get("command") == "status":
+            return self._status(received)
+        done = threading.Event()
+        job = {"request": request, "received": received, "done": done, "response": None}
+        self._queue.put(job)
+        done.wait()
+        return job["response"]
+
+    def _status(self, received):
+        return {
+            "ok": True,
+            "command": "status",
+            "config_path": self.site.config_path,
+            "cwd": os.getcwd(),
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "queued": self._queue.qsize(),
+            "requests_served": self.requests_served,
+            "last_build": self.last_build,
+            "queued_ms": 0.0,
+            "duration_ms": round((time.perf_counter() - received) * 1000, 1),
+        }
+
+    def _run_request(self, request):
+        """Runs one queued request. Returns the command-specific part of the response."""
+        command = request.get("command")
+        if command == "build":
+            self.site.build(clean=request.get("clean", False), jobs=request.get("jobs"))
+            report = self.site.last_report
+            return {"output_dir": self.site.config["output_dir"], "rendered_pages": report["rendered_pages"],
+                    "kept_pages": report["kept_pages"], "stages": report["stages"]}
+        if command == "update":
+            paths = request.get("paths")
+            if not paths:
+                raise ValueError("'update' needs a non-empty 'paths' list")
+            return {"targeted": self.site.update(paths), "output_dir": self.site.config["output_dir"]}
+        if command == "stop":
+            return {} # The connection handler shuts the server down once this response is sent
+        raise ValueError(f"Unknown command: {command!r}")
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            request = job["request"]
+            started = time.perf_counter()
+            response = {"command": request.get("command"), "queued_ms": round((started - job["received"]) * 1000, 1)}
+            try:
+                response.update(self._run_request(request))
+                response["ok"] = True
+            except Exception as e:
+                logger.error(f"Daemon request {request.get('command')!r} failed: {e}")
+                response.update(ok=False, error=str(e))
+            response["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if response["command"] in ("build", "update"):
+                self.last_build = dict(response, finished_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self.requests_served += 1
+            logger.info("Daemon request %s finished in %.0f ms (queued %.0f ms)",
+                        response["command"], response["duration_ms"], response["queued_ms"])
+            job["response"] = response
+            job["done"].set()
+
+    def _bind(self):
+        """Creates the socket server, replacing a stale socket file left by a dead daemon."""
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.remove(self.socket_path)
+            else:
+                raise RuntimeError(f"A build daemon is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        # Only the daemon's user may connect: any request can rebuild the site or stop the daemon.
+        previous_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(self.socket_path, _DaemonRequestHandler)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(self.socket_path, 0o600)
+        self._server.daemon = self
+
+    def serve_forever(self):
+        """Builds the site once, then serves requests until a 'stop' request or Ctrl+C."""
+        self.site.build()
+        if self.socket_path is None:
+            self.socket_path = get_daemon_socket_path(self.site.config)
+        self._bind()
+        self.started_at = time.time()
+        threading.Thread(target=self._worker, name="ssg-daemon-build", daemon=True).start()
+        logger.info("Build daemon listening on %s (pid %d)", self.socket_path, os.getpid())
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopping build daemon...")
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            logger.info("Build daemon stopped.")
+
+def daemon_command(config_path, socket_path=None):
+    """Runs the build daemon in the foreground (see BuildDaemon)."""
+    BuildDaemon(config_path, socket_path).serve_forever()
@@ -0,0 +1,222 @@
+import os
+import json
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the manifest layout or the way dependency hashes are computed changes,
+# so that manifests written by an older version are discarded instead of trusted.
+MANIFEST_VERSION = 5
+MANIFEST_FILE_NAME = "manifest.json"
+
+def get_cache_dir(config):
+    """Returns the directory used for persistent build caches (manifest, compiled templates, ...)."""
+    return config.get("cache_dir", ".ssg_cache")
+
+def hash_json(obj):
+    """Returns a stable SHA-1 hex digest of a JSON-serializable object."""
+    payload = json.dumps(obj, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Returns the SHA-1 hex digest of a file's content, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Config keys that change how a build runs but not what it renders. output_dir is among them
+# because staged builds render into a different directory each time.
+BUILD_OPTION_KEYS = {
+    "config_path", "output_dir", "cache_dir", "incremental", "jobs", "template_cache",
+    "template_cache_max_mb", "copy_mode", "staged_output", "keep_builds", "pretty_xml",
+    "sitemap_max_urls", "sitemap_max_bytes", "rss_collection", "rss_limit",
+    "asset_json_cache_mb", "watch_quiet_period_ms", "daemon_socket", "build_report", "report_top",
+}
+
+def config_hash(config):
+    """Hash of the configuration, ignoring keys that do not influence rendered output."""
+    return hash_json({k: v for k, v in config.items() if k not in BUILD_OPTION_KEYS})
+
+
+class BuildManifest:
+    """
+    Persistent record of what the previous build produced.
+
+    The manifest keeps two maps:
+      * 'sources': source file path -> fingerprint (size, mtime_ns, sha1). Fingerprints are
+        reused as long as size and mtime are unchanged, so a warm build only stats files.
+      * 'outputs': output file path -> the source it came from, the source hash and the
+        dependency hash it was rendered with, plus the page info needed for sitemap/RSS.
+        With "track_site_access", it also keeps the hash of every 'site.data' key and
+        collection the page read (see site_access).
+
+    Output paths are stored relative to the output directory, so a manifest stays valid when
+    the build is rendered into a staging directory (see output_staging).
+    """
+
+    def __init__(self, path, data=None, output_dir=None):
+        self.path = path
+        self.output_dir = output_dir
+        data = data or {}
+        self.previous_sources = data.get("sources", {})
+        self.previous_outputs = data.get("outputs", {})
+        self.sources = {}
+        self.outputs = {}
+
+    @classmethod
+    def load(cls, config):
+        """Loads the manifest from the cache directory, or returns an empty one."""
+        path = os.path.join(get_cache_dir(config), MANIFEST_FILE_NAME)
+        if not os.path.exists(path):
+            logger.info("No build manifest found at %s. Performing a full build.", path)
+            return cls(path, output_dir=config["output_dir"])
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read build manifest {path}: {e}. Performing a full build.")
+            return cls(path, output_dir=config["output_dir"])
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info("Build manifest version changed. Performing a full build.")
+            return cls(path, output_dir=config["output_dir"])
+        return cls(path, data, output_dir=config["output_dir"])
+
+    def save(self):
+        """Writes the manifest of the current build to disk."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "sources": self.sources, "outputs": self.outputs}, f)
+        os.replace(tmp_path, self.path)
+
+    def fingerprint(self, path):
+        """
+        Returns the fingerprint of a source file, hashing its content only when the
+        size or mtime differ from what the previous build recorded.
+        """
+        if path in self.sources:
+            return self.sources[path]
+        st = os.stat(path)
+        previous = self.previous_sources.get(path)
+        if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+            fingerprint = previous
+        else:
+            fingerprint = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": hash_file(path)}
+        self.sources[path] = fingerprint
+        return fingerprint
+
+    def output_key(self, output_path):
+        """Manifest key of an output path (relative to the output directory)."""
+        return os.path.relpath(output_path, self.output_dir) if self.output_dir else output_path
+
+    def lookup(self, output_path):
+        """Returns the previous build's record for an output path, if any."""
+        return self.previous_outputs.get(self.output_key(output_path))
+
+    def current(self, output_path):
+        """Returns this build's record for an output path, if any."""
+        return self.outputs.get(self.output_key(output_path))
+
+    def is_fresh(self, output_path, source_path, deps_hash, site_hashes=None):
+        """
+        True if 'output_path' was produced by the previous build from the same source content
+        with the same dependency hash, the extra files recorded with it (e.g. page data files)
+        and the site keys it read ('site_hashes' holds their current hashes) are unchanged and
+        the output file still exists.
+        """
+        entry = self.lookup(output_path)
+        if not entry or entry["source"] != source_path or entry["deps"] != deps_hash:
+            return False
+        if not os.path.exists(output_path) or not os.path.exists(source_path):
+            return False
+        if self.fingerprint(source_path)["sha1"] != entry["source_sha1"]:
+            return False
+        for extra_path, extra_sha1 in entry.get("extra", {}).items():
+            if not os.path.exists(extra_path) or self.fingerprint(extra_path)["sha1"] != extra_sha1:
+                return False
+        for key, key_hash in entry.get("site", {}).items():
+            if (site_hashes or {}).get(key) != key_hash:
+                return False
+        return True
+
+    def record(self, output_path, source_path, deps_hash, info=None, extra_files=(), site_access=None):
+        """
+        Records that 'output_path' was (re)produced from 'source_path' in this build.
+        'site_access' maps the site keys the page read to their hashes.
+        """
+        self.outputs[self.output_key(output_path)] = {
+            "source": source_path,
+            "source_sha1": self.fingerprint(source_path)["sha1"],
+            "deps": deps_hash,
+            "extra": {p: self.fingerprint(p)["sha1"] for p in extra_files if os.path.exists(p)},
+            "info": info,
+        }
+        if site_access is not None:
+            self.outputs[self.output_key(output_path)]["site"] = site_access
+
+    def record_copy(self, output_path, source_path):
+        """
+        Records a file copied (or found up to date) by file_sync.sync_tree. Copies are validated
+        against the output file itself, so no source hash is stored for them.
+        """
+        self.outputs[self.output_key(output_path)] = {"source": source_path, "deps": "copy"}
+
+    def keep(self, output_path):
+        """Carries the previous build's record for a still-valid output over to this build."""
+        entry = self.lookup(output_path)
+        self.outputs[self.output_key(output_path)] = entry
+        self.fingerprint(entry["source"])
+        for extra_path in entry.get("extra", {}):
+            self.fingerprint(extra_path)
+        return entry
+
+    def advance(self):
+        """
+        Makes this build's records the baseline for the next, in-process, update (watch mode).
+        Source fingerprints are carried over as-is: callers must forget() paths they know changed.
+        """
+        self.previous_sources = self.sources
+        self.previous_outputs = self.outputs
+        self.sources = dict(self.sources)
+        self.outputs = dict(self.outputs)
+
+    def successor(self):
+        """
+        Returns the manifest for the next build, with this build's records as its baseline,
+        exactly as if it had been saved and loaded again (used by long-lived build_core.Site objects).
+        """
+        return BuildManifest(self.path, {"sources": self.sources, "outputs": self.outputs}, output_dir=self.output_dir)
+
+    def forget(self, source_paths):
+        """Drops cached fingerprints so the given sources are stat'ed (and hashed) again."""
+        for path in source_paths:
+            self.sources.pop(path, None)
+            self.previous_sources.pop(path, None)
+
+    def drop(self, output_path):
+        """Removes an output's record from this build."""
+        self.outputs.pop(self.output_key(output_path), None)
+
+    def remove_stale_outputs(self, output_dir):
+        """Deletes outputs of the previous build that were not produced or kept by this build."""
+        removed = 0
+        for key in self.previous_outputs:
+            output_path = os.path.join(output_dir, key) if self.output_dir else key
+            if key in self.outputs or not os.path.exists(output_path):
+                continue
+            os.remove(output_path)
+            removed += 1
+            logger.info("Removed stale output: %s", output_path)
+            _remove_empty_parents(os.path.dirname(output_path), output_dir)
+        return removed
+
+
+def _remove_empty_parents(directory, stop_at):
+    """Removes 'directory' and its parents below 'stop_at' for as long as they are empty."""
+    stop_at = os.path.abspath(stop_at)
+    while directory and os.path.abspath(directory) != stop_at and os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
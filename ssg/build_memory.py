@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import logging
+import tracemalloc
+from contextlib import contextmanager
+
+from .file_sync import format_bytes
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by tracemalloc, by this profiler or by the import machinery are not the build's.
+_IGNORED_FILES = {
+    tracemalloc.__file__,
+    __file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+}
+
+def get_memory_report_path(config):
+    """Default location of a memory profile: '<output_dir>.memory.json'."""
+    return os.path.normpath(config["output_dir"]) + ".memory.json"
+
+def peak_rss():
+    """
+    Peak resident set size, in bytes, of this process and of its largest finished child process
+    (the render workers), as a tuple. (None, None) where the resource module is unavailable.
+    """
+    if resource is None:
+        return None, None
+    scale = 1 if sys.platform == "darwin" else 1024 # ru_maxrss is in bytes on macOS, KiB elsewhere
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+
+def deep_sizeof(obj):
+    """
+    Approximate memory held by a structure of dicts, lists, tuples and sets, contents included.
+    Objects reachable through several paths are counted once.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return size
+
+def _allocation_sites(snapshot, top):
+    """The 'top' source lines holding the most memory in a snapshot, ignoring _IGNORED_FILES."""
+    sites = []
+    for stat in snapshot.statistics("lineno"):
+        if stat.traceback[0].filename in _IGNORED_FILES:
+            continue
+        sites.append({"site": str(stat.traceback), "size_bytes": stat.size, "count": stat.count})
+        if len(sites) == top:
+            break
+    return sites
+
+class MemoryProfiler:
+    """
+    Tracks the memory use of a build with tracemalloc.
+
+    At each stage boundary (see build_report.BuildTimer.stage) it records the traced memory
+    still held, the peak reached during the stage and the process's peak RSS so far; these
+    are counters, so a stage costs the same whatever the size of the heap. A single snapshot
+    taken when the build stops gives the source lines holding the most memory. measure()
+    records the deep size of named in-memory structures. While disabled, stage() does nothing.
+    tracemalloc only sees the main process; render workers only show up in the child peak RSS.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.top = 10
+        self.stages = []
+        self.structures = {}
+
+    def start(self, top=10):
+        """Starts tracing allocations; 'top' is the number of allocation sites reported."""
+        self.enabled = True
+        self.top = top
+        self.stages = []
+        self.structures = {}
+        tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        """Records the memory use of the enclosed block as one build stage."""
+        if not self.enabled:
+            yield
+            return
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append({
+                "name": name,
+                "traced_bytes": current,
+                "traced_peak_bytes": peak,
+                "peak_rss_bytes": peak_rss()[0],
+            })
+
+    def measure(self, **structures):
+        """Records the deep size (see deep_sizeof) of each named structure."""
+        if self.enabled:
+            for name, value in structures.items():
+                self.structures[name] = deep_sizeof(value)
+
+    def discard(self):
+        """Stops tracing without a report (used by forked render workers)."""
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def stop(self):
+        """Stops tracing and returns the memory report of the build."""
+        if not self.enabled:
+            return None
+        self.enabled = False
+        snapshot = tracemalloc.take_snapshot()
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rss, child_rss = peak_rss()
+        return {
+            "peak_rss_bytes": rss,
+            "peak_worker_rss_bytes": child_rss,
+            "traced_peak_bytes": max([traced_peak] + [stage["traced_peak_bytes"] for stage in self.stages]),
+            "stages": self.stages,
+            "structures": self.structures,
+            "top_allocations": _allocation_sites(snapshot, self.top),
+        }
+
+def log_memory_report(report):
+    """Logs a memory report: peaks, per-stage memory, structure sizes and top allocation sites."""
+    def size(value):
+        return format_bytes(value) if value is not None else "n/a"
+
+    logger.info("Memory: peak RSS %s (render workers: %s), peak traced %s",
+                size(report["peak_rss_bytes"]), size(report["peak_worker_rss_bytes"]), size(report["traced_peak_bytes"]))
+    for stage in report["stages"]:
+        logger.info("  %-20s held %10s  peak %10s  RSS %10s", stage["name"], size(stage["traced_bytes"]),
+                    size(stage["traced_peak_bytes"]), size(stage["peak_rss_bytes"]))
+    if report["structures"]:
+        logger.info("In-memory structures:")
+        for name, value in sorted(report["structures"].items(), key=lambda entry: -entry[1]):
+            logger.info("  %-20s %10s", name, size(value))
+    if report["top_allocations"]:
+        logger.info("Top allocation sites still held at the end of the build:")
+        for site in report["top_allocations"]:
+            logger.info("  %10s in %7d block(s)  %s", size(site["size_bytes"]), site["count"], site["site"])
+
+def write_memory_report(report, path):
+    """Writes a memory report as JSON, atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info("Memory profile written to %s", path)
+
+# The memory profiler of the build running in this process; disabled unless requested.
+memory_profiler = MemoryProfiler()
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import logging
+import datetime
+from contextlib import contextmanager
+
+from .build_trace import tracer
+from .build_memory import memory_profiler
+
+logger = logging.getLogger(__name__)
+
+def get_report_path(config):
+    """Where the JSON build report goes: the "build_report" config key, else '<output_dir>.report.json'."""
+    return config.get("build_report") or os.path.normpath(config["output_dir"]) + ".report.json"
+
+class BuildTimer:
+    """
+    Collects the timings of one build: wall time per stage (in the order stages ran) and
+    render time per page, together with the template files each page used.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._started = time.perf_counter()
+        self.stages = [] # [(name, seconds)]
+        self.pages = [] # [(source_path, output_path, seconds, template_files)]
+        self.kept_pages = 0
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the enclosed block as one build stage. The stage is also recorded as a build trace
+        span and by the memory profiler, when those are running.
+        """
+        started = time.perf_counter()
+        try:
+            with tracer.span(name, "stage"), memory_profiler.stage(name):
+                yield
+        finally:
+            self.stages.append((name, time.perf_counter() - started))
+
+    def add_page(self, source_path, output_path, seconds, template_files=()):
+        """Records the render time of one page or collection item."""
+        self.pages.append((source_path, output_path, seconds, list(template_files)))
+
+    def template_times(self):
+        """Total render time and page count of the pages using each template, slowest first."""
+        totals = {}
+        for _, _, seconds, template_files in self.pages:
+            for template_file in template_files:
+                entry = totals.setdefault(template_file, [0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+        return sorted(((name, count, seconds) for name, (count, seconds) in totals.items()), key=lambda entry: -entry[2])
+
+    def report(self, **extra):
+        """The machine-readable report of the build, with 'extra' top-level keys added."""
+        report = {
+            "started_at": self.started_at.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            "total_seconds": time.perf_counter() - self._started,
+            "stages": [{"name": name, "seconds": seconds} for name, seconds in self.stages],
+            "rendered_pages": len(self.pages),
+            "kept_pages": self.kept_pages,
+            "pages": [
+                {"source": source, "output": output, "seconds": seconds, "templates": templates}
+                for source, output, seconds, templates in sorted(self.pages, key=lambda page: -page[2])
+            ],
+            "templates": [
+                {"template": name, "pages": count, "seconds": seconds}
+                for name, count, seconds in self.template_times()
+            ],
+        }
+        report.update(extra)
+        return report
+
+    def log_summary(self, top=10):
+        """Logs the stage timings and the slowest pages and templates."""
+        total = time.perf_counter() - self._started
+        logger.info("Build timings (%.0f ms total, %d page(s) rendered, %d kept):", total * 1000, len(self.pages), self.kept_pages)
+        for name, seconds in self.stages:
+            logger.info("  %-20s %9.1f ms %5.1f%%", name, seconds * 1000, seconds * 100 / total if total else 0)
+        if self.pages:
+            logger.info("Slowest pages:")
+            for source, _, seconds, _ in sorted(self.pages, key=lambda page: -page[2])[:top]:
+                logger.info("  %9.1f ms  %s", seconds * 1000, source)
+            logger.info("Slowest templates (render time of the pages using them):")
+            for name, count, seconds in self.template_times()[:top]:
+                logger.info("  %9.1f ms  %s (%d page(s))", seconds * 1000, name, count)
+
+def write_report(report, path):
+    """Writes a build report as JSON, atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info("Build report written to %s", path)
@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+def get_trace_path(config):
+    """Default location of a build trace: '<output_dir>.trace.json'."""
+    return os.path.normpath(config["output_dir"]) + ".trace.json"
+
+class BuildTrace:
+    """
+    Records spans in the Chrome trace-event format (loadable in chrome://tracing or Perfetto).
+
+    Recording is off until start() is called, and span() then costs next to nothing.
+    Timestamps come from time.time_ns() so that spans recorded in render worker processes
+    line up with the main process; every span carries the process id as "pid", the thread as
+    "tid" and a "worker" argument ('main' or 'worker-<pid>').
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.worker = "main"
+        self._events = []
+        self._lock = threading.Lock()
+
+    def start(self, worker="main"):
+        """Starts recording (drops events of a previous recording)."""
+        self.enabled = True
+        self.worker = worker
+        self._events = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+                         "args": {"name": f"ssg {worker}"}}]
+
+    def stop(self):
+        """Stops recording and returns every recorded event."""
+        self.enabled = False
+        return self.take_events()
+
+    def take_events(self):
+        """Returns the events recorded so far and forgets them (used to ship worker events)."""
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def add_events(self, events):
+        """Adds events recorded elsewhere, e.g. in a render worker process."""
+        with self._lock:
+            self._events.extend(events)
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Records the enclosed block as one complete ('X') event with the given arguments."""
+        if not self.enabled:
+            yield
+            return
+        started = time.time_ns()
+        try:
+            yield
+        finally:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": started / 1000,
+                "dur": (time.time_ns() - started) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+                "args": dict(args, worker=self.worker),
+            }
+            with self._lock:
+                self._events.append(event)
+
+def write_trace(events, path):
+    """Writes trace events as a Chrome trace JSON file, atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    os.replace(tmp_path, path)
+    logger.info("Build trace (%d events) written to %s", len(events), path)
+
+# The trace of the build running in this process; disabled unless a traced build is running.
+tracer = BuildTrace()
@@ -1,21 +1,55 @@
 import argparse
 import logging
 import os
+import json
 import shutil
 
 # Set up logging for informative messages (ensure this is at the top of the main script)
 logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-# Import functions from our new modules
+# Import functions from our new modules. Only lightweight, standard-library-only modules are
+# imported here: the CLI is spawned for every build, so modules that pull in Jinja2, watchdog,
+# http.server or multiprocessing are imported inside the commands that need them.
 from .config_loader import load_config
-from .build_core import build_command
+from .build_manifest import get_cache_dir, MANIFEST_FILE_NAME
+from .output_staging import list_builds, current_build, publish
 # Import load_plugins and run_hook. DO NOT import PLUGINS directly here.
 from .plugin_system import load_plugins, run_hook 
-from .dev_server import serve_command
 
 # --- CLI Commands ---
 
+def build_command(config_path, clean=False, jobs=None, profile=False, trace=False, memory_profile=False):
+    """Builds the static site (see build_core.Site.build)."""
+    from .build_core import build_command as run_build
+    run_build(config_path, clean=clean, jobs=jobs, profile=profile, trace=trace, memory_profile=memory_profile)
+
+def serve_command(config_path, port=8000):
+    """Builds the site, then serves it and rebuilds on changes (see dev_server)."""
+    from .dev_server import serve_command as run_server
+    run_server(config_path, port)
+
+def daemon_command(config_path, socket_path=None):
+    """Runs the build daemon in the foreground (see build_daemon)."""
+    from .build_daemon import daemon_command as run_daemon
+    run_daemon(config_path, socket_path)
+
+def _parse_settings(settings):
+    """Parses repeated KEY=VALUE options into a dict; values are JSON when they parse as JSON."""
+    parsed = {}
+    for setting in settings:
+        key, _, value = setting.partition("=")
+        try:
+            parsed[key] = json.loads(value)
+        except json.JSONDecodeError:
+            parsed[key] = value
+    return parsed
+
+def bench_command(config_path, **options):
+    """Benchmarks builds of a generated synthetic site (see site_benchmark); ignores the config."""
+    from .site_benchmark import bench_command as run_bench
+    run_bench(**options)
+
 def deploy_command(config_path):
     """Deploys the static site (placeholder)."""
     logger.info("Deploy command is a placeholder. Implement your deployment logic here.")
@@ -38,6 +72,43 @@ def create_command(config_path):
     run_hook("create_content", config=config) # This hook will use the global PLUGINS from plugin_system.py
     logger.info("Create command finished.")
 
+def rollback_command(config_path, steps=1):
+    """Points the output directory back to an earlier staged build (requires "staged_output")."""
+    config = load_config(config_path)
+    output_dir = config["output_dir"]
+    builds = [os.path.realpath(b) for b in list_builds(output_dir)]
+    current = current_build(output_dir)
+    if current not in builds:
+        logger.error("%s is not a staged build. Enable \"staged_output\" and build first.", output_dir)
+        return
+    target_index = builds.index(current) - steps
+    if target_index < 0:
+        logger.error("No build %d step(s) before %s. Available builds: %s", steps, current, ", ".join(builds))
+        return
+    publish(output_dir, builds[target_index])
+
+    # The manifest describes the newer build, so the next build must not trust it.
+    manifest_path = os.path.join(get_cache_dir(config), MANIFEST_FILE_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    logger.info("Rolled back to %s. The next build will be a full build.", builds[target_index])
+
+def template_graph_command(config_path, output_format="json"):
+    """Prints which templates every page and collection item depends on (see template_deps)."""
+    from .build_core import setup_jinja_environment
+    from .data_collections_loader import load_data_files, load_collections
+    from .template_deps import build_template_graph, graph_to_dot
+
+    config = load_config(config_path)
+    config["config_path"] = config_path
+    collections_data = load_collections(config)
+    env = setup_jinja_environment(config, load_data_files(config), collections_data)
+    graph = build_template_graph(env, config, collections_data)
+    if output_format == "dot":
+        print(graph_to_dot(graph))
+    else:
+        print(json.dumps(graph, indent=2))
+
 # --- Main CLI Entry Point ---
 
 def main():
@@ -49,6 +120,11 @@ def main():
 
     # Build command
     build_parser = subparsers.add_parser('build', help='Builds the static site.')
+    build_parser.add_argument('--clean', action='store_true', help='Ignore the build manifest and rebuild everything from scratch.')
+    build_parser.add_argument('--jobs', '-j', type=int, default=None, help='Number of render processes (0 = one per CPU). Defaults to the "jobs" config key or 1.')
+    build_parser.add_argument('--profile', action='store_true', help='Run the build under cProfile and write the stats to <output_dir>.prof.')
+    build_parser.add_argument('--trace', action='store_true', help='Write a Chrome trace-event file of the build to <output_dir>.trace.json.')
+    build_parser.add_argument('--memory-profile', action='store_true', help='Trace memory use per build stage with tracemalloc and write it to <output_dir>.memory.json.')
     build_parser.set_defaults(func=build_command)
 
     # Serve command
@@ -56,6 +132,38 @@ def main():
     serve_parser.add_argument('--port', type=int, default=8000, help='Port to serve the site on.')
     serve_parser.set_defaults(func=serve_command)
 
+    # Build daemon (talk to it with `python -m ssg.daemon_client`)
+    daemon_parser = subparsers.add_parser('daemon', help='Keeps the site warm in memory and builds on request over a Unix socket.')
+    daemon_parser.add_argument('--socket', default=None, help='Socket path. Defaults to the "daemon_socket" config key or <cache_dir>/daemon.sock.')
+    daemon_parser.set_defaults(func=daemon_command)
+
+    # Rollback command (staged builds only)
+    rollback_parser = subparsers.add_parser('rollback', help='Switches the output directory back to a previous staged build.')
+    rollback_parser.add_argument('--steps', type=int, default=1, help='How many builds to go back.')
+    rollback_parser.set_defaults(func=rollback_command)
+
+    # Template dependency graph
+    graph_parser = subparsers.add_parser('template-graph', help='Prints the template dependency graph used for incremental builds.')
+    graph_parser.add_argument('--format', choices=['json', 'dot'], default='json', help='Output format (dot is for Graphviz).')
+    graph_parser.set_defaults(func=template_graph_command)
+
+    # Macro benchmark on a synthetic site
+    bench_parser = subparsers.add_parser('bench', help='Generates a synthetic site and benchmarks cold, warm and single-change builds.')
+    bench_parser.add_argument('--pages', type=int, default=500, help='Number of regular pages.')
+    bench_parser.add_argument('--posts', type=int, default=500, help='Number of posts in the collection.')
+    bench_parser.add_argument('--data-kb', type=int, default=256, help='Approximate size of the generated _data/catalog.json, in KB.')
+    bench_parser.add_argument('--static-files', type=int, default=100, help='Number of 2 KB files in static/.')
+    bench_parser.add_argument('--template-depth', type=int, default=3, help='Length of the layout inheritance chain.')
+    bench_parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE', dest='settings',
+                              help='Extra config key for the generated site; VALUE is parsed as JSON when possible. Repeatable.')
+    bench_parser.add_argument('--repeats', type=int, default=3, help='Runs per scenario; medians are reported.')
+    bench_parser.add_argument('--jobs', '-j', type=int, default=None, help='Number of render processes (0 = one per CPU).')
+    bench_parser.add_argument('--output', '-o', default=None, help='Write the JSON report to this file instead of stdout.')
+    bench_parser.add_argument('--dir', default=None, help='Generate the site here (must be empty) instead of a temporary directory.')
+    bench_parser.add_argument('--keep', action='store_true', help='Keep the generated site afterwards.')
+    bench_parser.add_argument('--verbose', action='store_true', help='Show the build logs.')
+    bench_parser.set_defaults(func=bench_command)
+
     # Deploy command (placeholder)
     deploy_parser = subparsers.add_parser('deploy', help='Deploys the static site.')
     deploy_parser.set_defaults(func=deploy_command)
@@ -70,6 +178,19 @@ def main():
     if args.command == 'serve':
         # Pass config_path to serve_command, which then passes it to build_command
         args.func(args.config, args.port) 
+    elif args.command == 'build':
+        args.func(args.config, clean=args.clean, jobs=args.jobs, profile=args.profile, trace=args.trace,
+                  memory_profile=args.memory_profile)
+    elif args.command == 'daemon':
+        args.func(args.config, socket_path=args.socket)
+    elif args.command == 'rollback':
+        args.func(args.config, steps=args.steps)
+    elif args.command == 'bench':
+        args.func(args.config, pages=args.pages, posts=args.posts, data_kb=args.data_kb, static_files=args.static_files,
+                  template_depth=args.template_depth, config=_parse_settings(args.settings), repeats=args.repeats, jobs=args.jobs, output=args.output,
+                  directory=args.dir, keep=args.keep, verbose=args.verbose)
+    elif args.command == 'template-graph':
+        args.func(args.config, output_format=args.format)
     else:
         # Pass config_path to other commands
         args.func(args.config)
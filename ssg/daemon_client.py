@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+import socket
+import argparse
+
+# Client for the build daemon (see build_daemon). It only imports the standard library, so
+# `python -m ssg.daemon_client build` starts much faster than `python -m ssg.cli build`.
+from .config_loader import load_config
+from .build_manifest import get_cache_dir
+
+def get_daemon_socket_path(config):
+    """Unix socket of the build daemon: the "daemon_socket" config key, else '<cache_dir>/daemon.sock'."""
+    return config.get("daemon_socket") or os.path.join(get_cache_dir(config), "daemon.sock")
+
+def send_request(socket_path, request, timeout=None):
+    """
+    Sends one request (a JSON-serializable dict) to the daemon and returns its response.
+    Requests are answered in the order the daemon received them; builds wait in its queue,
+    so 'timeout' (seconds, None = wait forever) must leave room for the builds ahead.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile('r', encoding='utf-8') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError(f"The build daemon at {socket_path} closed the connection without answering.")
+    return json.loads(line)
+
+def main(argv=None):
+    """Forwards build/update/status/stop commands to a running daemon; exits with 1 on failure."""
+    parser = argparse.ArgumentParser(description="Sends commands to a running StaticGen build daemon.")
+    parser.add_argument('--config', default='config.json', help='Path to the configuration file (used to find the socket).')
+    parser.add_argument('--socket', default=None, help='Path of the daemon socket (overrides the config).')
+    parser.add_argument('--timeout', type=float, default=None, help='Seconds to wait for the answer (default: no limit).')
+    subparsers = parser.add_subparsers(dest='command', required=True, help='Available commands')
+
+    build_parser = subparsers.add_parser('build', help='Runs an (incremental) build of the warm site.')
+    build_parser.add_argument('--clean', action='store_true', help='Rebuild everything from scratch.')
+    build_parser.add_argument('--jobs', '-j', type=int, default=None, help='Number of render processes.')
+
+    update_parser = subparsers.add_parser('update', help='Rebuilds only what the given changed paths affect.')
+    update_parser.add_argument('paths', nargs='+', help='Changed source files or directories.')
+
+    subparsers.add_parser('status', help='Shows the state of the daemon and its last build.')
+    subparsers.add_parser('stop', help='Stops the daemon once queued requests are done.')
+
+    args = parser.parse_args(argv)
+    socket_path = args.socket or get_daemon_socket_path(load_config(args.config))
+
+    request = {"command": args.command}
+    if args.command == 'build':
+        request.update(clean=args.clean, jobs=args.jobs)
+    elif args.command == 'update':
+        # The daemon may run in another working directory.
+        request["paths"] = [os.path.abspath(path) for path in args.paths]
+
+    try:
+        response = send_request(socket_path, request, timeout=args.timeout)
+    except (OSError, ConnectionError) as e:
+        print(f"Could not reach the build daemon at {socket_path}: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(response, indent=2))
+    return 0 if response.get("ok") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
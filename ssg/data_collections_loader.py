@@ -1,12 +1,30 @@
 import os
 import json
 import logging
+import datetime
 
-from .front_matter_parser import parse_front_matter
+from .front_matter_parser import parse_front_matter, read_front_matter
 from .url_helpers import url
 
 logger = logging.getLogger(__name__)
 
+# Format of the 'date' front matter key of collection items.
+DATE_FORMAT = "%Y-%m-%d"
+
+def parse_item_date(front_matter, file_path):
+    """
+    Parses the 'date' front matter value into a datetime.
+    Missing or unparseable dates become datetime.min so that items always sort.
+    """
+    date_str = front_matter.get('date')
+    if not date_str or not isinstance(date_str, str):
+        return datetime.datetime.min
+    try:
+        return datetime.datetime.strptime(date_str, DATE_FORMAT)
+    except ValueError:
+        logger.warning(f"Could not parse date '{date_str}' for collection item: {file_path}. Using default.")
+        return datetime.datetime.min
+
 def load_data_files(config):
     """
     Loads data from JSON files in the 'data_dir' (e.g., _data).
@@ -41,11 +59,68 @@ def load_data_files(config):
                 logger.warning(f"Skipping non-JSON data file: {file_name}")
     return data
 
+class LazyCollectionItem(dict):
+    """
+    A collection item loaded in lazy mode: only the front matter is read up front.
+    Its 'content' is read from disk each time it is accessed (item["content"] or
+    `item.content` in templates) and is not kept, so memory scales with front matter size.
+    Note that item.get("content") does not trigger a load and returns None.
+    """
+
+    def __missing__(self, key):
+        if key != "content":
+            raise KeyError(key)
+        with open(self["path"], 'r', encoding='utf-8') as f:
+            return parse_front_matter(f.read())[1]
+
+def collection_file_paths(collection_path):
+    """Paths of a collection's item files (HTML only), in the order items are loaded."""
+    for root, _, files in os.walk(collection_path):
+        for file_name in files:
+            if file_name.endswith('.html'): # Only process HTML files
+                yield os.path.join(root, file_name)
+
+def load_collection_item(config, collection_name, collection_settings, file_path):
+    """Loads a single collection item (see load_collections)."""
+    collection_path = collection_settings["path"]
+    if collection_settings.get("lazy", False):
+        front_matter, body_content = read_front_matter(file_path), None
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        front_matter, body_content = parse_front_matter(content)
+    
+    # Determine output path for collection item
+    relative_path = os.path.relpath(file_path, collection_path)
+    output_dir_name = collection_settings.get("output", collection_name)
+    
+    # Collection items will now also retain their original filename.html in the output.
+    output_file_name = relative_path 
+
+    item_output_path = os.path.join(output_dir_name, output_file_name)
+    
+    item = {
+        "path": file_path,
+        "relative_path": relative_path,
+        "output_path_relative": item_output_path,
+        "front_matter": front_matter,
+        "date": parse_item_date(front_matter, file_path), # Typed date for sorting/feeds
+        "content": body_content, # Raw content after front matter
+        "url": url(item_output_path, config) # Absolute URL for the item
+    }
+    if collection_settings.get("lazy", False):
+        del item["content"]
+        item = LazyCollectionItem(item)
+    return item
+
 def load_collections(config):
     """
     Loads content from defined collections.
-    Each collection item will have its front matter parsed.
+    Each collection item will have its front matter parsed, and its 'date' front matter
+    parsed once into the item's 'date' field (a datetime, see parse_item_date).
     Only HTML files are considered.
+    Collections with "lazy": true in their settings only read each file's front matter;
+    their items are LazyCollectionItem objects that load the body on demand.
     """
     collections_data = {}
     collections_config = config.get("collections", {})
@@ -57,34 +132,8 @@ def load_collections(config):
             continue
 
         logger.info(f"Loading collection: {collection_name} from {collection_path}")
-        items = []
-        for root, _, files in os.walk(collection_path):
-            for file_name in files:
-                if file_name.endswith('.html'): # Only process HTML files
-                    file_path = os.path.join(root, file_name)
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    front_matter, body_content = parse_front_matter(content)
-                    
-                    # Determine output path for collection item
-                    relative_path = os.path.relpath(file_path, collection_path)
-                    output_dir_name = collection_settings.get("output", collection_name)
-                    
-                    # Collection items will now also retain their original filename.html in the output.
-                    output_file_name = relative_path 
-
-                    item_output_path = os.path.join(output_dir_name, output_file_name)
-                    
-                    item = {
-                        "path": file_path,
-                        "relative_path": relative_path,
-                        "output_path_relative": item_output_path,
-                        "front_matter": front_matter,
-                        "content": body_content, # Raw content after front matter
-                        "url": url(item_output_path, config) # Absolute URL for the item
-                    }
-                    items.append(item)
-        collections_data[collection_name] = items
+        collections_data[collection_name] = [
+            load_collection_item(config, collection_name, collection_settings, file_path)
+            for file_path in collection_file_paths(collection_path)
+        ]
     return collections_data
-
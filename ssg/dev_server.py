@@ -1,6 +1,6 @@
 import os
+import time
 import logging
-import datetime
 import http.server
 import socketserver
 import threading
@@ -9,62 +9,139 @@ import mimetypes
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-from .build_core import build_command
-from .config_loader import load_config
-from .plugin_system import load_plugins, run_hook
+from .build_core import Site
 
 logger = logging.getLogger(__name__)
 
+class RebuildScheduler:
+    """
+    Coalesces file change notifications into batched rebuilds on a dedicated thread.
+
+    Changed paths are collected until no new change has arrived for 'quiet_period' seconds,
+    then 'rebuild(changed_paths)' runs once for the whole batch. Changes that arrive while a
+    rebuild is running start a new batch, so a follow-up rebuild always picks them up and the
+    served output ends up matching the latest sources.
+    """
+
+    def __init__(self, rebuild, quiet_period=0.2):
+        self._rebuild = rebuild
+        self.quiet_period = quiet_period
+        self._condition = threading.Condition()
+        self._pending = set()
+        self._last_change = 0.0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="ssg-rebuild", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Stops the scheduler thread after the rebuild in progress, if any, finishes."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def notify(self, path):
+        """Records a changed path; called from the watchdog thread, never blocks on a build."""
+        with self._condition:
+            self._pending.add(path)
+            self._last_change = time.monotonic()
+            self._condition.notify()
+
+    def _next_batch(self):
+        """Waits for pending changes followed by a quiet period. Returns None once stopped."""
+        with self._condition:
+            while not self._pending and not self._stopped:
+                self._condition.wait()
+            while not self._stopped:
+                remaining = self._last_change + self.quiet_period - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._stopped:
+                return None
+            batch, self._pending = self._pending, set()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._rebuild(batch)
+            except Exception as e:
+                logger.error(f"Error during rebuild: {e}")
+
+
 class MyHandler(FileSystemEventHandler):
-    """Handles file system events for the watch mode."""
-    def __init__(self, config_path_arg):
+    """
+    Handles file system events for the watch mode.
+    Relevant changes are handed to a RebuildScheduler, which runs the rebuilds off the
+    watchdog thread; call start()/stop() around the observer's lifetime.
+    Batches are applied to the warm build_core.Site, with targeted rebuilds whenever possible.
+    """
+    def __init__(self, site):
         super().__init__()
-        self.config_path = config_path_arg
-        self.last_rebuild_time = datetime.datetime.now()
-        self.config = load_config(config_path_arg) # Load config once for event handler
+        self.site = site
+        self.config_path = site.config_path
+        self.scheduler = RebuildScheduler(self.rebuild, quiet_period=site.config.get("watch_quiet_period_ms", 200) / 1000)
 
-    def on_any_event(self, event):
-        # Debounce rebuilds to avoid multiple rapid rebuilds for single save operations
-        if datetime.datetime.now() - self.last_rebuild_time < datetime.timedelta(seconds=1):
-            return
+    def start(self):
+        self.scheduler.start()
+
+    def stop(self):
+        self.scheduler.stop()
+
+    def rebuild(self, changed_paths):
+        """Runs one build for a batch of changed paths."""
+        logger.info(f"Detected change in {', '.join(sorted(changed_paths))}. Rebuilding................................................")
+        started = time.perf_counter()
+        targeted = self.site.update(changed_paths)
+        logger.info("%s complete in %.0f ms. Refresh your browser to see changes.",
+                    "Targeted rebuild" if targeted else "Rebuild", (time.perf_counter() - started) * 1000)
 
+    def is_relevant(self, path):
+        """True if a change to 'path' affects the built site."""
+        config = self.site.config
         # Only rebuild on changes to relevant directories
         relevant_dirs = [
-            self.config['pages_dir'],
-            self.config['templates_dir'],
-            self.config['static_dir'],
-            self.config['assets_dir'],
-            self.config.get('data_dir'),
-            self.config.get('plugins_dir')
+            config['pages_dir'],
+            config['templates_dir'],
+            config['static_dir'],
+            config['assets_dir'],
+            config.get('data_dir'),
+            config.get('plugins_dir')
         ]
         # Add collection paths
-        for coll_settings in self.config.get('collections', {}).values():
+        for coll_settings in config.get('collections', {}).values():
             relevant_dirs.append(coll_settings.get('path'))
         
         # Filter out None values and ensure paths are absolute for comparison
         relevant_dirs = [os.path.abspath(d) for d in relevant_dirs if d and os.path.exists(d)]
         
-        event_path_abs = os.path.abspath(event.src_path)
+        event_path_abs = os.path.abspath(path)
+        return any(event_path_abs.startswith(d) for d in relevant_dirs) or event_path_abs == os.path.abspath(self.config_path)
 
-        if any(event_path_abs.startswith(d) for d in relevant_dirs) or event_path_abs == os.path.abspath(self.config_path):
-            logger.info(f"Detected change in {event.src_path}. Rebuilding................................................")
-            try:
-                build_command(self.config_path) # This call will handle plugin loading internally
-                self.last_rebuild_time = datetime.datetime.now()
-                logger.info("Rebuild complete. Refresh your browser to see changes.")
-            except Exception as e:
-                logger.error(f"Error during rebuild: {e}")
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed_no_write"):
+            return # Reads never change the site
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path and self.is_relevant(path):
+                self.scheduler.notify(os.fsdecode(path))
 
 def serve_command(config_path, port=8000):
     """Starts a local development server with live reloading."""
-    config = load_config(config_path)
+    # Initial build; the warm site is kept for the rebuilds triggered by file changes
+    site = Site(config_path)
+    site.build()
+    config = site.config
     output_dir = config["output_dir"]
 
-    # Initial build (this will call build_command which handles plugin loading)
-    build_command(config_path)
-
     # Start file system observer
-    event_handler = MyHandler(config_path)
+    event_handler = MyHandler(site)
+    event_handler.start()
     observer = Observer()
     
     # Watch all relevant directories
@@ -197,5 +274,6 @@ def serve_command(config_path, port=8000):
         httpd.shutdown()
         observer.stop()
         observer.join()
+        event_handler.stop()
         logger.info("Server and watcher stopped.")
 
@@ -0,0 +1,92 @@
+import os
+import shutil
+import logging
+
+from .build_manifest import hash_file
+from .build_trace import tracer
+
+logger = logging.getLogger(__name__)
+
+def new_sync_stats():
+    """Counters reported by sync_tree."""
+    return {"copied_files": 0, "copied_bytes": 0, "skipped_files": 0, "skipped_bytes": 0, "removed_files": 0}
+
+def format_bytes(size):
+    """Formats a byte count for log messages (e.g. '1.5 MB')."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def copy_file(source_path, destination_path):
+    """shutil.copy2 that replaces an existing destination, recorded as a span of the build trace."""
+    with tracer.span("copy " + os.path.basename(source_path), "copy", source=source_path, destination=destination_path):
+        if os.path.lexists(destination_path):
+            # Never write through an existing file: it may be hardlinked into a previous staged build.
+            os.remove(destination_path)
+        return shutil.copy2(source_path, destination_path)
+
+def _is_up_to_date(source_path, source_stat, destination_path):
+    """True if the destination already holds the source's content (size and mtime, else content hash)."""
+    try:
+        destination_stat = os.stat(destination_path)
+    except FileNotFoundError:
+        return False
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == destination_stat.st_mtime_ns:
+        return True
+    if hash_file(source_path) != hash_file(destination_path):
+        return False
+    shutil.copystat(source_path, destination_path)
+    return True
+
+def sync_tree(source_dir, destination_dir, manifest=None, prune=False):
+    """Copies new or changed files from 'source_dir' into 'destination_dir' and returns sync stats."""
+    stats = new_sync_stats()
+    expected = set()
+    for root, _, files in os.walk(source_dir):
+        for file_name in files:
+            source_path = os.path.join(root, file_name)
+            destination_path = os.path.join(destination_dir, os.path.relpath(source_path, source_dir))
+            expected.add(os.path.normpath(destination_path))
+            source_stat = os.stat(source_path)
+            if _is_up_to_date(source_path, source_stat, destination_path):
+                stats["skipped_files"] += 1
+                stats["skipped_bytes"] += source_stat.st_size
+            else:
+                os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+                copy_file(source_path, destination_path)
+                stats["copied_files"] += 1
+                stats["copied_bytes"] += source_stat.st_size
+            if manifest:
+                manifest.record_copy(destination_path, source_path)
+
+    if prune and os.path.exists(destination_dir):
+        for root, dirs, files in os.walk(destination_dir, topdown=False):
+            for file_name in files:
+                destination_path = os.path.join(root, file_name)
+                if os.path.normpath(destination_path) not in expected:
+                    os.remove(destination_path)
+                    stats["removed_files"] += 1
+                    logger.info("Removed stale file: %s", destination_path)
+            if root != destination_dir and not os.listdir(root):
+                os.rmdir(root)
+    return stats
+
+def copy_tree(source_dir, destination_dir, manifest=None):
+    """Copies every file of 'source_dir' into 'destination_dir', recording the copies in the manifest."""
+    def copy_function(source_path, destination_path):
+        copy_file(source_path, destination_path)
+        if manifest:
+            manifest.record_copy(destination_path, source_path)
+
+    shutil.copytree(source_dir, destination_dir, dirs_exist_ok=True, copy_function=copy_function)
+
+def log_sync_stats(label, stats):
+    """Logs a one-line summary of sync_tree stats."""
+    logger.info(
+        "%s: copied %d file(s) (%s), skipped %d unchanged file(s) (%s), removed %d stale file(s).",
+        label, stats["copied_files"], format_bytes(stats["copied_bytes"]),
+        stats["skipped_files"], format_bytes(stats["skipped_bytes"]), stats["removed_files"],
+    )
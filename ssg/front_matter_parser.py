@@ -20,3 +20,25 @@ def parse_front_matter(content):
                 return {}, content
     return {}, content
 
+
+def read_front_matter(file_path, chunk_size=4096):
+    """
+    Reads and parses only the front matter of a file, stopping at the closing '+++'
+    delimiter instead of reading the whole body.
+    Returns the front matter dict ({} if the file has none).
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = f.read(3)
+        if buffer != '+++':
+            return {}
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Start just before the new chunk in case the delimiter straddles two chunks.
+            search_from = max(3, len(buffer) - 2)
+            buffer += chunk
+            end = buffer.find('+++', search_from)
+            if end != -1:
+                return parse_front_matter(buffer[:end + 3])[0]
+    return parse_front_matter(buffer)[0]
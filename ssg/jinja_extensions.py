@@ -13,6 +13,8 @@ class TagExtension(Extension):
     These tags process their arguments to generate appropriate paths or timestamps.
     """
     tags = ['static','url','now']
+    # Part of the compiled template cache key; bump whenever parse() generates different code.
+    version = "1"
 
     def __init__(self, environment):
         super().__init__(environment)
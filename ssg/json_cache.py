@@ -0,0 +1,73 @@
+import os
+import json
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class JSONFileCache:
+    """
+    LRU cache of parsed JSON files, keyed by path and validated by mtime and size.
+
+    The memory bound is expressed in bytes of source JSON ('max_bytes'); the least recently
+    used files are evicted once the cached files add up to more than that.
+    Cached objects are shared between every caller and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.reset()
+
+    def reset(self, max_bytes=None):
+        """Empties the cache and its counters (called at the start of every build)."""
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._entries = OrderedDict() # path -> (mtime_ns, size, data)
+        self._cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Counters for the build summary."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def take_stats(self):
+        """Returns the counters and sets them back to zero, keeping the cached entries."""
+        stats = self.stats()
+        self.hits = self.misses = self.evictions = 0
+        return stats
+
+    def add_stats(self, stats):
+        """Adds counters collected elsewhere (e.g. in a render worker process)."""
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+        self.evictions += stats["evictions"]
+
+    def load(self, path):
+        """
+        Returns the parsed content of a JSON file, from the cache if the file is unchanged.
+        Raises the same exceptions as open()/json.load() on failure; failures are not cached.
+        """
+        st = os.stat(path)
+        entry = self._entries.get(path)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if entry:
+            self._cached_bytes -= entry[1]
+            del self._entries[path]
+        if st.st_size <= self.max_bytes:
+            self._entries[path] = (st.st_mtime_ns, st.st_size, data)
+            self._cached_bytes += st.st_size
+            while self._cached_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._cached_bytes -= evicted_size
+                self.evictions += 1
+        return data
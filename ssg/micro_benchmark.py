@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+
+from .config_loader import load_config
+from .front_matter_parser import parse_front_matter
+from .url_helpers import url, static
+from .plugin_system import load_plugins, run_hook
+from .data_collections_loader import load_data_files, load_collections
+from .site_benchmark import generate_site
+from . import build_core
+
+# Checked-in baseline that --compare uses when no file is given; refresh it with --save-baseline.
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "micro_baseline.json")
+
+# A plugin with a no-op per-page hook, so that run_hook measures the real dispatch path.
+_NOOP_PLUGIN = "def after_render_page(page_path, output_path, config):\n    pass\n"
+
+def _fixtures(root):
+    """
+    Generates a small synthetic site in 'root' and loads what the per-page functions need.
+    Returns {name: zero-argument callable} for every benchmark.
+    """
+    config_path = generate_site(root, pages=20, posts=20, data_kb=64, static_files=5)
+    os.makedirs(os.path.join(root, "_plugins"), exist_ok=True)
+    with open(os.path.join(root, "_plugins", "noop.py"), 'w', encoding='utf-8') as f:
+        f.write(_NOOP_PLUGIN)
+    config = load_config(config_path)
+    config["config_path"] = config_path
+    load_plugins(config)
+    collections_data = load_collections(config)
+    env = build_core.setup_jinja_environment(config, load_data_files(config), collections_data)
+
+    page_path = os.path.join(config["pages_dir"], "section_0", "page_0.html")
+    with open(page_path, 'r', encoding='utf-8') as f:
+        page_source = f.read()
+    front_matter, body = parse_front_matter(page_source)
+    page_data, data_json_urls = build_core._load_page_data(front_matter, config)
+    output_relative_path = "section_0/page_0.html"
+    output_path = os.path.join(config["output_dir"], output_relative_path)
+    template_obj = env.from_string(body)
+    context = build_core._page_context(env, config, front_matter, page_data, data_json_urls, output_relative_path)
+
+    return {
+        "parse_front_matter": lambda: parse_front_matter(page_source),
+        "url": lambda: url(output_relative_path, config),
+        "static": lambda: static("css/style.css", config),
+        "run_hook": lambda: run_hook("after_render_page", page_path=page_path, output_path=output_path, config=config),
+        "load_json_file_from_assets": lambda: build_core._load_json_file_from_assets(front_matter["data_file"], config),
+        "page_context": lambda: build_core._page_context(env, config, front_matter, page_data, data_json_urls, output_relative_path),
+        "render_and_save_output": lambda: build_core._render_and_save_output(
+            env, config, template_obj, context, output_path, page_path, content_for_sitemap_rss=body),
+    }
+
+def _calibrate(func, min_time):
+    """Number of calls per timed sample so that one sample takes at least 'min_time' seconds."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time or number >= 1 << 24:
+            return number
+        number *= 2
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def measure(func, repeats=20, warmup=3, min_time=0.02):
+    """
+    Times 'func': calibrates the calls per sample, runs 'warmup' samples that are thrown away,
+    then 'repeats' samples. Returns per-call statistics in nanoseconds.
+    """
+    number = _calibrate(func, min_time)
+    samples = []
+    for sample in range(warmup + repeats):
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        if sample >= warmup:
+            samples.append((time.perf_counter_ns() - started) / number)
+    return {
+        "median_ns": statistics.median(samples),
+        "p95_ns": _percentile(samples, 0.95),
+        "min_ns": min(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "calls_per_sample": number,
+        "samples": repeats,
+    }
+
+def run_benchmarks(names=None, repeats=20, warmup=3, min_time=0.02):
+    """Runs the selected benchmarks (all by default) on a temporary site. Returns {name: statistics}."""
+    package_logger = logging.getLogger("ssg")
+    previous_level = package_logger.level
+    package_logger.setLevel(logging.WARNING) # Per-call INFO logging would dominate the timings
+    try:
+        with tempfile.TemporaryDirectory(prefix="ssg-micro-") as root:
+            benchmarks = _fixtures(root)
+            unknown = set(names or ()) - set(benchmarks)
+            if unknown:
+                raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}. Available: {', '.join(benchmarks)}")
+            return {name: measure(func, repeats=repeats, warmup=warmup, min_time=min_time)
+                    for name, func in benchmarks.items() if not names or name in names}
+    finally:
+        package_logger.setLevel(previous_level)
+        load_plugins({}) # Drop the benchmark plugin
+
+def compare(results, baseline, threshold=0.10):
+    """
+    Compares median times with a baseline. Returns [(name, baseline_ns, current_ns, ratio)] for
+    the benchmarks present in both, the names whose median got slower by more than 'threshold',
+    and the names missing from the baseline.
+    """
+    rows, regressions, missing = [], [], []
+    for name, stats in results.items():
+        if name not in baseline:
+            missing.append(name)
+            continue
+        before, after = baseline[name]["median_ns"], stats["median_ns"]
+        ratio = after / before if before else float("inf")
+        rows.append((name, before, after, ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions, missing
+
+def main(argv=None):
+    """
+    Fails (exit status 1) when compared with a baseline that is missing, lacks a benchmark, or
+    has a benchmark that got slower than the threshold.
+    """
+    parser = argparse.ArgumentParser(description="Micro-benchmarks the functions StaticGen calls once per page.")
+    parser.add_argument('names', nargs='*', help='Benchmarks to run (default: all).')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed samples per benchmark.')
+    parser.add_argument('--warmup', type=int, default=3, help='Samples run and discarded before timing.')
+    parser.add_argument('--min-time', type=float, default=0.02, help='Minimum duration of one sample, in seconds.')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Write the results as a baseline file.')
+    parser.add_argument('--compare', metavar='FILE', nargs='?', const=DEFAULT_BASELINE,
+                        help=f'Compare the results with a baseline file (default: {os.path.relpath(DEFAULT_BASELINE)}).')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed slowdown of a median before it is flagged (0.10 = 10%%).')
+    args = parser.parse_args(argv)
+
+    if args.compare and not os.path.isfile(args.compare):
+        print(f"FAIL: baseline {args.compare} not found. Record one with --save-baseline {args.compare}")
+        return 1
+
+    results = run_benchmarks(args.names, repeats=args.repeats, warmup=args.warmup, min_time=args.min_time)
+    print(f"{'benchmark':28s} {'median':>12s} {'p95':>12s} {'min':>12s}")
+    for name, stats in results.items():
+        print(f"{name:28s} {stats['median_ns'] / 1000:9.2f} us {stats['p95_ns'] / 1000:9.2f} us {stats['min_ns'] / 1000:9.2f} us")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(), "benchmarks": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.save_baseline}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get("python") != platform.python_version():
+        print(f"Note: the baseline was recorded with Python {baseline.get('python')}, this is {platform.python_version()}")
+    rows, regressions, missing = compare(results, baseline["benchmarks"], args.threshold)
+    print(f"Compared with {args.compare} (threshold {args.threshold:.0%}):")
+    for name, before, after, ratio in rows:
+        flag = "  SLOWER" if name in regressions else ""
+        print(f"  {name:28s} {before / 1000:9.2f} us -> {after / 1000:9.2f} us  {ratio - 1:+7.1%}{flag}")
+    for name in missing:
+        print(f"FAIL: {name} is not in the baseline. Record it with --save-baseline {args.compare}")
+    for name in regressions:
+        print(f"FAIL: {name} is more than {args.threshold:.0%} slower than the baseline")
+    return 1 if regressions or missing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import os
+import shutil
+import logging
+import datetime
+
+logger = logging.getLogger(__name__)
+
+def get_builds_dir(output_dir):
+    """Directory holding the staged builds, next to the output directory (e.g. 'build.builds')."""
+    return os.path.normpath(output_dir) + ".builds"
+
+def _link_tree(source_dir, destination_dir):
+    """Recreates 'source_dir' in 'destination_dir' with hardlinks, falling back to copies."""
+    linked = 0
+    for root, _, files in os.walk(source_dir):
+        target_root = os.path.join(destination_dir, os.path.relpath(root, source_dir))
+        os.makedirs(target_root, exist_ok=True)
+        for file_name in files:
+            source_path = os.path.join(root, file_name)
+            target_path = os.path.join(target_root, file_name)
+            try:
+                os.link(source_path, target_path)
+                linked += 1
+            except OSError:
+                # e.g. cross-device builds dir or a filesystem without hardlinks
+                shutil.copy2(source_path, target_path)
+    return linked
+
+def list_builds(output_dir):
+    """Returns the staged build directories, oldest first."""
+    builds_dir = get_builds_dir(output_dir)
+    if not os.path.isdir(builds_dir):
+        return []
+    return sorted(
+        os.path.join(builds_dir, name) for name in os.listdir(builds_dir)
+        if os.path.isdir(os.path.join(builds_dir, name)) and not name.startswith(".")
+    )
+
+def current_build(output_dir):
+    """The build directory 'output_dir' points to, or None if it is not a staged-build symlink."""
+    if not os.path.islink(output_dir):
+        return None
+    return os.path.realpath(output_dir)
+
+def publish(output_dir, build_dir):
+    """
+    Atomically points 'output_dir' at 'build_dir'.
+    'output_dir' is a symlink; a new link is created next to it and renamed over the old one,
+    so readers always see either the previous or the new build, never a partial one.
+    """
+    parent_dir = os.path.dirname(os.path.abspath(output_dir))
+    if os.path.isdir(output_dir) and not os.path.islink(output_dir):
+        # One-time migration from a plain output directory: move it aside as a regular build.
+        # It is named after its last modification, in the build id format of OutputStage.prepare,
+        # so that it sorts before the staged build being published.
+        modified = datetime.datetime.fromtimestamp(os.stat(output_dir).st_mtime)
+        legacy_dir = os.path.join(get_builds_dir(output_dir), modified.strftime("%Y%m%d-%H%M%S-%f-legacy"))
+        logger.info("Moving existing output directory %s to %s", output_dir, legacy_dir)
+        os.makedirs(os.path.dirname(legacy_dir), exist_ok=True)
+        os.rename(output_dir, legacy_dir)
+
+    tmp_link = os.path.join(parent_dir, f".{os.path.basename(os.path.normpath(output_dir))}.{os.getpid()}.link")
+    os.symlink(os.path.relpath(build_dir, parent_dir), tmp_link)
+    os.replace(tmp_link, output_dir)
+    logger.info("Published build %s -> %s", output_dir, build_dir)
+
+def prune_builds(output_dir, keep, previous=None):
+    """
+    Deletes staged builds so that at most 'keep' remain. The published build is always kept,
+    then 'previous' (the build published before it, which may be older than other builds after
+    a rollback), then the newest of the rest.
+    """
+    current = current_build(output_dir)
+    ranked = sorted(list_builds(output_dir), reverse=True) # Newest first
+    priority = [path for path in (current, previous and os.path.realpath(previous)) if path]
+    ranked.sort(key=lambda build_dir: priority.index(os.path.realpath(build_dir))
+                if os.path.realpath(build_dir) in priority else len(priority)) # Stable: keeps newest first
+    for build_dir in ranked[max(1, keep):]:
+        logger.info("Removing old build: %s", build_dir)
+        shutil.rmtree(build_dir)
+
+
+class OutputStage:
+    """
+    A build that is rendered into a fresh directory under '<output_dir>.builds' and then
+    swapped in with publish(). Unless 'clean' is set, the stage starts as a hardlinked
+    copy of the currently published build, so unchanged outputs cost no copying.
+    """
+
+    def __init__(self, output_dir, keep_builds=2):
+        self.output_dir = output_dir
+        self.keep_builds = max(1, keep_builds)
+        self.build_dir = None
+
+    def prepare(self, clean=False):
+        """Creates the staging directory and returns its path."""
+        build_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.build_dir = os.path.join(get_builds_dir(self.output_dir), build_id)
+        os.makedirs(self.build_dir)
+        if not clean and os.path.isdir(self.output_dir):
+            linked = _link_tree(os.path.realpath(self.output_dir), self.build_dir)
+            logger.info("Staging build in %s (%d file(s) reused from the previous build)", self.build_dir, linked)
+        else:
+            logger.info("Staging build in %s", self.build_dir)
+        return self.build_dir
+
+    def publish(self):
+        """
+        Swaps the staged build in and removes builds beyond 'keep_builds', keeping the build it
+        replaces (a rollback target stays available even if it is older than other builds).
+        """
+        previous = current_build(self.output_dir)
+        publish(self.output_dir, self.build_dir)
+        prune_builds(self.output_dir, self.keep_builds, previous=previous)
+
+    def discard(self):
+        """Removes the staging directory after a failed build."""
+        if self.build_dir and os.path.isdir(self.build_dir):
+            shutil.rmtree(self.build_dir)
@@ -1,16 +1,84 @@
 import os
-import logging
 import sys
+import time
+import types
+import logging
+import importlib.util
+
+from .build_manifest import hash_file
+from .build_trace import tracer
 
 logger = logging.getLogger(__name__)
 
 # Global list to store loaded plugins. This is the SINGLE source of truth.
 PLUGINS = []
 
+# Hooks the build calls; their dispatch lists are built as soon as plugins are loaded.
+KNOWN_HOOKS = (
+    "before_build", "after_build",
+    "before_render_pages", "after_render_pages", # Batch hooks, once per build with every page
+    "before_render_page", "after_render_page", # Per page, skipped when no plugin implements them
+    "before_copy_static", "after_copy_static", "before_copy_assets", "after_copy_assets",
+    "before_generate_sitemap", "after_generate_sitemap", "before_generate_rss_feed", "after_generate_rss_feed",
+    "deploy", "create_content",
+)
+
+# Dispatch table: hook name -> [(plugin name, callable)] in plugin load order, derived from PLUGINS.
+_HOOK_TABLE = {}
+
+# Hooks whose implementations can change the content of rendered pages.
+RENDER_HOOKS = ("before_build", "before_render_pages", "before_render_page", "after_render_page", "after_render_pages")
+
+# Loaded plugin files: path -> {"mtime_ns", "size", "sha1", "module"}.
+_PLUGIN_FILES = {}
+
+# Plugin modules are registered in sys.modules under this private package, so that dataclasses,
+# pickle and typing.get_type_hints can find them without plugins_dir being on sys.path.
+PLUGIN_PACKAGE = "_ssg_plugins"
+
+# Per-build hook statistics: (plugin name, hook name) -> [call count, cumulative seconds].
+HOOK_STATS = {}
+
+def _load_plugin_file(file_path, module_name):
+    """
+    Returns the plugin module for a file, executing the file only if it is new or its content
+    changed since it was last loaded (checked by mtime and size, then by SHA-1).
+    The module is imported from its spec and registered in sys.modules as
+    '_ssg_plugins.<module_name>' (replacing a previous version); sys.path is left untouched.
+    """
+    st = os.stat(file_path)
+    loaded = _PLUGIN_FILES.get(file_path)
+    if loaded and loaded["mtime_ns"] == st.st_mtime_ns and loaded["size"] == st.st_size:
+        return loaded["module"]
+    sha1 = hash_file(file_path)
+    if loaded and loaded["sha1"] == sha1:
+        loaded.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+        return loaded["module"]
+
+    if PLUGIN_PACKAGE not in sys.modules:
+        package = types.ModuleType(PLUGIN_PACKAGE)
+        package.__path__ = [] # A namespace for plugin modules; nothing is ever imported from it
+        sys.modules[PLUGIN_PACKAGE] = package
+    qualified_name = f"{PLUGIN_PACKAGE}.{module_name}"
+    spec = importlib.util.spec_from_file_location(qualified_name, file_path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before executing, as importlib does: code run at import time may look itself up.
+    sys.modules[qualified_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[qualified_name]
+        raise
+    _PLUGIN_FILES[file_path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": sha1, "module": module}
+    logger.info(f"{'Reloaded' if loaded else 'Loaded'} plugin: {module_name}")
+    return module
+
 def load_plugins(config):
     """
     Loads Python modules from the plugins directory and populates the global PLUGINS list.
     This function is responsible for managing the PLUGINS list.
+    Calling it again (e.g. on rebuilds in watch mode) re-executes only the plugin files that
+    changed; unchanged plugins keep their module and its state.
     """
     global PLUGINS # Declare intent to modify the global PLUGINS list
     
@@ -18,41 +86,109 @@ def load_plugins(config):
     
     # Clear existing plugins to ensure a fresh load on rebuilds
     PLUGINS.clear() 
+    _HOOK_TABLE.clear()
 
     if not plugins_dir or not os.path.exists(plugins_dir):
         logger.info("No plugins directory found or specified. Skipping plugin loading.")
+        for loaded in _PLUGIN_FILES.values():
+            sys.modules.pop(loaded["module"].__name__, None)
+        _PLUGIN_FILES.clear()
         return [] # Return an empty list if no plugins
 
     logger.info(f"Loading plugins from {plugins_dir}")
-    
-    # Add plugins directory to Python path temporarily
-    sys.path.insert(0, plugins_dir)
 
-    for file_name in os.listdir(plugins_dir):
+    plugin_paths = set()
+    for file_name in sorted(os.listdir(plugins_dir)):
         if file_name.endswith(".py") and not file_name.startswith("__"):
             module_name = file_name[:-3]
+            file_path = os.path.join(plugins_dir, file_name)
+            plugin_paths.add(file_path)
             try:
-                # Import the module dynamically
-                module = __import__(module_name)
-                PLUGINS.append(module) # Directly append to the global PLUGINS list
-                logger.info(f"Loaded plugin: {module_name}")
+                PLUGINS.append(_load_plugin_file(file_path, module_name)) # Directly append to the global PLUGINS list
             except Exception as e:
                 logger.error(f"Error loading plugin {module_name}: {e}")
-    
-    # Remove plugins directory from path after loading
-    sys.path.pop(0) 
+                _PLUGIN_FILES.pop(file_path, None) # Retry on the next load
+
+    # Forget plugins whose file is gone
+    for file_path in list(_PLUGIN_FILES):
+        if file_path not in plugin_paths:
+            sys.modules.pop(_PLUGIN_FILES.pop(file_path)["module"].__name__, None)
+
+    for hook_name in KNOWN_HOOKS:
+        _hook_callables(hook_name)
     return PLUGINS # Return the global list (optional, but good for consistency)
 
-def run_hook(hook_name, *args, **kwargs):
+def plugin_name(plugin):
+    """A plugin's name as used in logs and statistics: its file name without '.py'."""
+    return plugin.__name__.rpartition(".")[2]
+
+def render_plugin_fingerprints():
     """
-    Runs a specified hook across all loaded plugins.
-    It accesses the global PLUGINS list managed by load_plugins.
+    SHA-1 of every loaded plugin that implements a hook able to change rendered pages
+    (RENDER_HOOKS), by plugin name. Editing any other plugin does not invalidate pages.
     """
-    # No 'global PLUGINS' needed here if PLUGINS is only read.
-    # If it were modified, 'global PLUGINS' would be needed.
+    sha1_by_module = {id(loaded["module"]): loaded["sha1"] for loaded in _PLUGIN_FILES.values()}
+    fingerprints = {}
     for plugin in PLUGINS:
-        if hasattr(plugin, hook_name) and callable(getattr(plugin, hook_name)):
-            try:
-                getattr(plugin, hook_name)(*args, **kwargs)
-            except Exception as e:
-                logger.error(f"Error running hook '{hook_name}' in plugin '{plugin.__name__}': {e}")
+        if any(callable(getattr(plugin, hook_name, None)) for hook_name in RENDER_HOOKS):
+            fingerprints[plugin_name(plugin)] = sha1_by_module.get(id(plugin))
+    return fingerprints
+
+def _hook_callables(hook_name):
+    """The (plugin name, callable) pairs implementing a hook, looked up once per loaded plugin set."""
+    callables = _HOOK_TABLE.get(hook_name)
+    if callables is None:
+        callables = []
+        for plugin in PLUGINS:
+            hook = getattr(plugin, hook_name, None)
+            if callable(hook):
+                callables.append((plugin_name(plugin), hook))
+        _HOOK_TABLE[hook_name] = callables
+    return callables
+
+def has_hook(hook_name):
+    """True if any loaded plugin implements the hook; lets callers skip building hook arguments."""
+    return bool(_hook_callables(hook_name))
+
+def run_hook(hook_name, *args, **kwargs):
+    """
+    Runs a specified hook across all loaded plugins, through the dispatch table built by
+    load_plugins. Call counts and wall time are added to HOOK_STATS per plugin and hook, and
+    each call is recorded as a build trace span.
+    """
+    for plugin_name, hook in _hook_callables(hook_name):
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"{plugin_name}.{hook_name}", "hook", plugin=plugin_name, hook=hook_name):
+                hook(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Error running hook '{hook_name}' in plugin '{plugin_name}': {e}")
+        stats = HOOK_STATS.setdefault((plugin_name, hook_name), [0, 0.0])
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+def take_hook_stats():
+    """Returns HOOK_STATS as a list of (plugin, hook, calls, seconds) and clears it."""
+    stats = [(plugin_name, hook_name, calls, seconds) for (plugin_name, hook_name), (calls, seconds) in HOOK_STATS.items()]
+    HOOK_STATS.clear()
+    return stats
+
+def add_hook_stats(stats):
+    """Adds statistics collected elsewhere (e.g. by take_hook_stats in a render worker process)."""
+    for plugin_name, hook_name, calls, seconds in stats:
+        entry = HOOK_STATS.setdefault((plugin_name, hook_name), [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+
+def log_hook_stats(stats=None):
+    """
+    Logs hook statistics, slowest plugin hooks first. Without 'stats', logs and clears the
+    current HOOK_STATS.
+    """
+    stats = sorted(take_hook_stats() if stats is None else stats, key=lambda entry: -entry[3])
+    if not stats:
+        return
+    logger.info("Plugin hook timings:")
+    for plugin_name, hook_name, calls, seconds in stats:
+        logger.info("  %-20s %-20s %7d call(s) %9.1f ms total %8.3f ms/call",
+                    plugin_name, hook_name, calls, seconds * 1000, seconds * 1000 / calls)
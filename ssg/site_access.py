@@ -0,0 +1,83 @@
+from .build_manifest import hash_json
+
+# Recorded when a template enumerates a mapping (iteration, keys(), items(), ...) instead of
+# looking up a single key: the page then depends on the whole mapping.
+ALL_KEYS = "*"
+
+class SiteAccessLog:
+    """Collects the 'site.data' / 'site.collections' keys read while rendering one page."""
+
+    def __init__(self):
+        self.keys = set()
+
+    def start(self):
+        """Forgets the keys recorded for the previous page."""
+        self.keys = set()
+
+    def take(self):
+        """Returns the sorted keys recorded since start()."""
+        keys = sorted(self.keys)
+        self.keys = set()
+        return keys
+
+class TrackedMapping(dict):
+    """
+    A dict that reports the keys read from it to a SiteAccessLog, as '<prefix>:<key>'.
+    Used for 'site.data' and 'site.collections' when "track_site_access" is enabled.
+    Values are shared with the wrapped dict; only top-level keys are tracked.
+    """
+
+    def __init__(self, data, log, prefix):
+        super().__init__(data)
+        self._log = log
+        self._prefix = prefix
+
+    def _record(self, key):
+        self._log.keys.add(f"{self._prefix}:{key}")
+
+    def __getitem__(self, key):
+        self._record(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._record(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self._record(key)
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self._record(ALL_KEYS)
+        return super().__iter__()
+
+    def __len__(self):
+        self._record(ALL_KEYS)
+        return super().__len__()
+
+    def keys(self):
+        self._record(ALL_KEYS)
+        return super().keys()
+
+    def values(self):
+        self._record(ALL_KEYS)
+        return super().values()
+
+    def items(self):
+        self._record(ALL_KEYS)
+        return super().items()
+
+def site_access_hashes(site_data, collections_data, manifest):
+    """
+    Current hash of every key a page can record: each top-level 'site.data' key, each
+    collection (its item sources) and the ALL_KEYS entry of both mappings.
+    """
+    collection_hashes = {
+        name: hash_json([(item["path"], manifest.fingerprint(item["path"])["sha1"]) for item in items])
+        for name, items in collections_data.items()
+    }
+    hashes = {f"data:{key}": hash_json(value) for key, value in site_data.items()}
+    hashes.update({f"collections:{name}": value for name, value in collection_hashes.items()})
+    hashes[f"data:{ALL_KEYS}"] = hash_json(site_data)
+    hashes[f"collections:{ALL_KEYS}"] = hash_json(collection_hashes)
+    return hashes
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import platform
+import statistics
+import tempfile
+
+from .build_core import Site
+from .build_memory import peak_rss
+
+# Words used for synthetic titles and paragraphs.
+_WORDS = ("static", "site", "page", "build", "template", "render", "widget", "post", "author", "data",
+          "cache", "layout", "asset", "feed", "sitemap", "collection", "python", "jinja", "fast", "simple")
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+def _front_matter(data):
+    return "+++\n" + json.dumps(data, indent=4) + "\n+++\n"
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def _write_templates(root, depth):
+    """Writes a chain of 'depth' layouts, each extending the previous one, and post.html on top."""
+    _write(os.path.join(root, "templates", "partials", "nav.html"),
+           '<nav><a href="{{ url(\'index.html\') }}">Home</a> <a href="{{ url(\'blog/index.html\') }}">Blog</a></nav>\n')
+    _write(os.path.join(root, "templates", "layout_0.html"), """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>{% block title %}{{ page.front_matter.title }} - {{ site.config.site_title }}{% endblock %}</title>
+    <meta name="description" content="{{ page.front_matter.description }}">
+    <link rel="stylesheet" href="{% static 'css/style.css' %}">
+</head>
+<body>
+    {% include "partials/nav.html" %}
+    <div class="container">{% block content %}{% endblock %}</div>
+    <footer>Contact: {{ site.data.settings.contact_email }} ({{ site.data.catalog | length }} catalog entries)</footer>
+</body>
+</html>
+""")
+    for level in range(1, depth):
+        _write(os.path.join(root, "templates", f"layout_{level}.html"),
+               f'{{% extends "layout_{level - 1}.html" %}}\n'
+               f'{{% block content %}}<div class="level-{level}">{{{{ super() }}}}</div>{{% endblock %}}\n')
+    _write(os.path.join(root, "templates", "post.html"), f"""{{% extends "layout_{depth - 1}.html" %}}
+{{% block content %}}
+    <h1>{{{{ page.front_matter.title }}}}</h1>
+    <p class="post-meta">Published on {{{{ page.front_matter.date }}}}
+        {{% for author in site.data.authors if author.id == page.front_matter.author %}}by {{{{ author.name }}}}{{% endfor %}}
+    </p>
+    <article>{{{{ page.content | safe }}}}</article>
+{{% endblock %}}
+""")
+
+def generate_site(root, pages=500, posts=500, data_kb=256, static_files=100, template_depth=3, seed=0, config=None):
+    """
+    Writes a synthetic site shaped like the sample site (pages/, _posts/, _data/, assets/,
+    static/, templates/) into 'root' and returns the path of its config.json.
+
+    'pages' regular pages (plus an index and a blog listing page), 'posts' collection items,
+    a '_data/catalog.json' of about 'data_kb' KB, 'static_files' files of 2 KB in static/ and
+    a chain of 'template_depth' layouts. The same seed always produces the same site.
+    'config' holds extra config keys (e.g. {"track_site_access": true}) to benchmark options with.
+    """
+    rng = random.Random(seed)
+    depth = max(1, template_depth)
+    layout = f"layout_{depth - 1}.html"
+    _write_templates(root, depth)
+
+    authors = [{"id": f"author_{i}", "name": f"Author {i}", "bio": _sentence(rng, 8)} for i in range(10)]
+    _write(os.path.join(root, "_data", "authors.json"), json.dumps(authors, indent=4))
+    _write(os.path.join(root, "_data", "settings.json"), json.dumps({"contact_email": "contact@example.com"}))
+    catalog, catalog_size = [], 0
+    while catalog_size < data_kb * 1024:
+        entry = {"sku": f"SKU-{len(catalog):06d}", "name": _sentence(rng, 3), "price": rng.randint(1, 1000),
+                 "description": _sentence(rng, 20)}
+        catalog.append(entry)
+        catalog_size += len(json.dumps(entry))
+    _write(os.path.join(root, "_data", "catalog.json"), json.dumps(catalog))
+
+    for i in range(pages):
+        front_matter = {"layout": layout, "title": f"Page {i}", "description": _sentence(rng, 10)}
+        if i % 10 == 0:
+            # One page in ten fetches page data from assets, like the sample widget page.
+            front_matter["data_file"] = f"data/page_{i}.json"
+            _write(os.path.join(root, "assets", "data", f"page_{i}.json"),
+                   json.dumps({"description": _sentence(rng), "features": [_sentence(rng, 4) for _ in range(5)]}))
+        body = "".join(f"    <p>{_sentence(rng, 30)}</p>\n" for _ in range(5))
+        _write(os.path.join(root, "pages", "section_%d" % (i // 100), f"page_{i}.html"),
+               _front_matter(front_matter) +
+               f'{{% extends "{layout}" %}}\n{{% block content %}}\n    <h1>{{{{ page.front_matter.title }}}}</h1>\n{body}'
+               "    <p><a href=\"{{ url('index.html') }}\">Home</a></p>\n{% endblock %}\n")
+    _write(os.path.join(root, "pages", "index.html"),
+           _front_matter({"layout": layout, "title": "Home", "description": "Benchmark site."}) +
+           f'{{% extends "{layout}" %}}\n{{% block content %}}\n'
+           "    {% for post in (site.collections.posts | sort(attribute='date', reverse=True))[0:10] %}\n"
+           '        <h3><a href="{{ post.url }}">{{ post.front_matter.title }}</a></h3>\n'
+           "    {% endfor %}\n{% endblock %}\n")
+    _write(os.path.join(root, "pages", "blog", "index.html"),
+           _front_matter({"layout": layout, "title": "Blog Archive", "description": "All posts."}) +
+           f'{{% extends "{layout}" %}}\n{{% block content %}}\n'
+           "    {% for post in site.collections.posts | sort(attribute='date', reverse=True) %}\n"
+           '        <div class="post-list-item"><a href="{{ post.url }}">{{ post.front_matter.title }}</a></div>\n'
+           "    {% endfor %}\n{% endblock %}\n")
+
+    for i in range(posts):
+        front_matter = {"title": f"Post {i}", "author": f"author_{i % len(authors)}", "layout": "post.html",
+                        "date": f"{2000 + i % 25}-{1 + i % 12:02d}-{1 + i % 28:02d}", "description": _sentence(rng, 10)}
+        body = "".join(f"<p>{_sentence(rng, 40)}</p>\n" for _ in range(8))
+        _write(os.path.join(root, "_posts", f"post-{i:06d}.html"), _front_matter(front_matter) + body)
+
+    _write(os.path.join(root, "static", "css", "style.css"), "body { font-family: sans-serif; }\n")
+    for i in range(static_files):
+        path = os.path.join(root, "static", "files", f"file_{i}.bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(rng.randbytes(2048))
+
+    site_config = {
+        "base_url": "http://localhost:8000",
+        "output_dir": os.path.join(root, "build"),
+        "cache_dir": os.path.join(root, ".ssg_cache"),
+        "pages_dir": os.path.join(root, "pages"),
+        "templates_dir": os.path.join(root, "templates"),
+        "static_dir": os.path.join(root, "static"),
+        "assets_dir": os.path.join(root, "assets"),
+        "data_dir": os.path.join(root, "_data"),
+        "plugins_dir": os.path.join(root, "_plugins"),
+        "site_title": "Benchmark Site",
+        "site_description": "A synthetic site for benchmarks.",
+        "collections": {"posts": {"path": os.path.join(root, "_posts"), "output": "blog"}},
+    }
+    site_config.update(config or {})
+    config_path = os.path.join(root, "config.json")
+    _write(config_path, json.dumps(site_config, indent=4))
+    return config_path
+
+def _change_one_post(root, run):
+    """Edits the body of one post, the way an author would between two builds."""
+    posts_dir = os.path.join(root, "_posts")
+    post_files = sorted(os.listdir(posts_dir))
+    path = os.path.join(posts_dir, post_files[len(post_files) // 2])
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f"<p>Edit {run}.</p>\n")
+
+def _timed_build(site, clean, jobs):
+    started = time.perf_counter()
+    site.build(clean=clean, jobs=jobs)
+    seconds = time.perf_counter() - started
+    report = site.last_report
+    rss, worker_rss = peak_rss()
+    return {
+        "seconds": seconds,
+        "rendered_pages": report["rendered_pages"],
+        "kept_pages": report["kept_pages"],
+        # Pages brought up to date per second, whether rendered or kept from the previous build.
+        "pages_per_second": (report["rendered_pages"] + report["kept_pages"]) / seconds,
+        "peak_rss_bytes": rss,
+        "peak_worker_rss_bytes": worker_rss,
+    }
+
+def _summary(runs):
+    return {
+        "median_seconds": statistics.median(run["seconds"] for run in runs),
+        "median_pages_per_second": statistics.median(run["pages_per_second"] for run in runs),
+        "rendered_pages": runs[-1]["rendered_pages"],
+        "peak_rss_bytes": max((run["peak_rss_bytes"] or 0) for run in runs) or None,
+        "runs": runs,
+    }
+
+def run_benchmark(root, repeats=3, jobs=None, **corpus):
+    """
+    Generates a site in 'root' (see generate_site for the 'corpus' size knobs) and times three
+    scenarios, 'repeats' times each:
+      * cold: a clean build with a new Site (nothing loaded, no manifest),
+      * warm: an incremental build of the warm Site with nothing changed,
+      * single_change: an incremental build of the warm Site after editing one post.
+    Returns the benchmark report. Peak RSS is the process's high-water mark after each run,
+    so it never goes down between runs.
+    """
+    config_path = generate_site(root, **corpus)
+    scenarios = {"cold": [], "warm": [], "single_change": []}
+    site = None
+    for _ in range(repeats):
+        site = Site(config_path)
+        scenarios["cold"].append(_timed_build(site, True, jobs))
+    for _ in range(repeats):
+        scenarios["warm"].append(_timed_build(site, False, jobs))
+    for run in range(repeats):
+        _change_one_post(root, run)
+        scenarios["single_change"].append(_timed_build(site, False, jobs))
+    return {
+        "corpus": dict(corpus, root=root),
+        "jobs": site.last_report["jobs"],
+        "repeats": repeats,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {name: _summary(runs) for name, runs in scenarios.items()},
+    }
+
+def bench_command(pages=500, posts=500, data_kb=256, static_files=100, template_depth=3, config=None, repeats=3,
+                  jobs=None, output=None, directory=None, keep=False, verbose=False):
+    """
+    Runs the macro benchmark (see run_benchmark) in a temporary directory, or in 'directory'
+    (which must not exist or be empty), and prints the JSON report, or writes it to 'output'.
+    The generated site is removed afterwards unless 'keep'. Build logs are hidden unless 'verbose'.
+    """
+    if directory and os.path.isdir(directory) and os.listdir(directory):
+        raise ValueError(f"Benchmark directory {directory} is not empty")
+    root = directory or tempfile.mkdtemp(prefix="ssg-bench-")
+    package_logger = logging.getLogger("ssg")
+    previous_level = package_logger.level
+    if not verbose:
+        package_logger.setLevel(logging.WARNING)
+    print(f"Benchmarking a synthetic site with {pages} page(s) and {posts} post(s) in {root}...", file=sys.stderr)
+    try:
+        report = run_benchmark(os.path.abspath(root), repeats=repeats, jobs=jobs, pages=pages, posts=posts,
+                               data_kb=data_kb, static_files=static_files, template_depth=template_depth, config=config)
+    finally:
+        package_logger.setLevel(previous_level)
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+    for name, summary in report["scenarios"].items():
+        print(f"  {name:14s} {summary['median_seconds'] * 1000:9.1f} ms  {summary['rendered_pages']:6d} rendered  "
+              f"{summary['median_pages_per_second']:9.0f} pages/s", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"Benchmark report written to {output}", file=sys.stderr)
+    else:
+        print(text)
+    return report
@@ -0,0 +1,75 @@
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+# Modules that printing help must never import: each of them costs several milliseconds
+# and is only needed by specific subcommands (rendering, serve, daemon).
+FORBIDDEN_MODULES = ("jinja2", "watchdog", "http.server", "socketserver", "concurrent.futures.process", "ssg.build_core")
+
+def parse_importtime(stderr):
+    """
+    Parses `python -X importtime` output into a list of (module, self_us, cumulative_us, depth),
+    depth 0 being modules imported directly by the program.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2 # One leading space, then two per level
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+def measure_startup(command, runs=10):
+    """
+    Runs `python -X importtime -m <command>` 'runs' times in fresh interpreters.
+    Returns a dict with the wall times (ms), the total import times (ms) and the parsed
+    imports of the last run.
+    """
+    wall_ms, import_ms, imports = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-m", *command],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+        if completed.returncode != 0:
+            raise RuntimeError(f"'{' '.join(command)}' exited with status {completed.returncode}:\n{completed.stderr[-2000:]}")
+        imports = parse_importtime(completed.stderr)
+        import_ms.append(sum(cumulative for _, _, cumulative, depth in imports if depth == 0) / 1000)
+    return {"wall_ms": wall_ms, "import_ms": import_ms, "imports": imports}
+
+def main(argv=None):
+    """Fails (exit status 1) when the CLI starts slower than the budget or imports forbidden modules."""
+    parser = argparse.ArgumentParser(description="Measures the startup time of the StaticGen CLI.")
+    parser.add_argument('--budget-ms', type=float, default=120.0, help='Maximum median wall time of one CLI run, in ms.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreter runs.')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list.')
+    parser.add_argument('command', nargs='*', default=["ssg.cli", "build", "--help"],
+                        help='Module and arguments to run, after "--" (default: ssg.cli build --help).')
+    args = parser.parse_args(argv)
+
+    result = measure_startup(args.command, runs=args.runs)
+    median_wall = statistics.median(result["wall_ms"])
+    median_import = statistics.median(result["import_ms"])
+    print(f"{' '.join(args.command)}: median wall {median_wall:.1f} ms "
+          f"(min {min(result['wall_ms']):.1f}, max {max(result['wall_ms']):.1f}), "
+          f"median import time {median_import:.1f} ms over {args.runs} run(s)")
+    print("Slowest imports (cumulative):")
+    for name, _, cumulative_us, depth in sorted(result["imports"], key=lambda entry: -entry[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {'  ' * depth}{name}")
+
+    failures = []
+    imported = {name for name, _, _, _ in result["imports"]}
+    forbidden = [name for name in FORBIDDEN_MODULES if name in imported]
+    if forbidden and "--help" in args.command:
+        failures.append(f"imports modules it does not need: {', '.join(forbidden)}")
+    if median_wall > args.budget_ms:
+        failures.append(f"median wall time {median_wall:.1f} ms exceeds the budget of {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
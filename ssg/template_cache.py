@@ -0,0 +1,137 @@
+import os
+import marshal
+import hashlib
+import logging
+import importlib.util
+
+import jinja2
+from jinja2 import Environment, TemplateSyntaxError
+from jinja2.meta import find_referenced_templates
+
+logger = logging.getLogger(__name__)
+
+class CachingEnvironment(Environment):
+    """
+    A Jinja2 Environment that keeps compiled template code on disk.
+
+    Jinja's own bytecode cache only applies to templates loaded through a loader, while
+    every page in 'pages_dir' goes through `from_string`. Both paths end up in `compile`,
+    so the cache lives there: compiled code objects are stored with `marshal`, keyed by the
+    template source, its name/filename, the versions of our extensions, Jinja2 and Python.
+
+    Each entry also stores the templates the source references through extends/include/import
+    (see jinja2.meta.find_referenced_templates; None stands for a dynamic reference), so the
+    template dependency graph is known without parsing again. After a compile, the references
+    are in `last_references` and, for named templates, in `references_by_name`.
+
+    Every hit touches the entry's mtime, so prune_compiled_cache can evict the least recently
+    used entries once the cache directory outgrows its size limit.
+    """
+
+    # Bump whenever the layout of cache entries changes.
+    CACHE_FORMAT = "2"
+
+    def __init__(self, *args, compiled_cache_dir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compiled_cache_dir = compiled_cache_dir
+        self.compiled_cache_hits = 0
+        self.compiled_cache_misses = 0
+        self.last_references = []
+        self.references_by_name = {}
+
+    def _remember_references(self, name, references):
+        self.last_references = references
+        if name is not None:
+            self.references_by_name[name] = references
+
+    def _compiled_cache_key(self, source, name, filename):
+        """Hash of everything that influences the compiled code of a template."""
+        digest = hashlib.sha1()
+        extension_versions = sorted(
+            f"{type(ext).__module__}.{type(ext).__name__}:{getattr(ext, 'version', '')}"
+            for ext in self.extensions.values()
+        )
+        for part in (self.CACHE_FORMAT, jinja2.__version__, importlib.util.MAGIC_NUMBER.hex(), *extension_versions,
+                     name or "", filename or "", source):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def compile(self, source, name=None, filename=None, raw=False, defer_init=False):
+        """Compiles a template, reusing the on-disk compiled code when available."""
+        if raw or defer_init or not isinstance(source, str):
+            return super().compile(source, name, filename, raw, defer_init)
+
+        cache_path = None
+        if self.compiled_cache_dir:
+            key = self._compiled_cache_key(source, name, filename)
+            cache_path = os.path.join(self.compiled_cache_dir, key[:2], key + ".code")
+            try:
+                with open(cache_path, 'rb') as f:
+                    references, code = marshal.load(f)
+                os.utime(cache_path) # Marks the entry as recently used
+                self.compiled_cache_hits += 1
+                self._remember_references(name, references)
+                return code
+            except FileNotFoundError:
+                pass
+            except (OSError, EOFError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable compiled template cache entry {cache_path}: {e}")
+
+        try:
+            ast = self._parse(source, name, filename)
+        except TemplateSyntaxError:
+            self.handle_exception(source=source)
+        references = sorted(find_referenced_templates(ast), key=lambda ref: (ref is None, ref or ""))
+        code = super().compile(ast, name, filename, raw, defer_init)
+        self._remember_references(name, references)
+        if not cache_path:
+            return code
+
+        self.compiled_cache_misses += 1
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Write to a per-process temporary file first so parallel workers never read a partial entry.
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                marshal.dump((references, code), f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write compiled template cache entry {cache_path}: {e}")
+        return code
+
+def prune_compiled_cache(cache_dir, max_bytes):
+    """
+    Keeps a compiled template cache directory under 'max_bytes': when it is larger, the least
+    recently used entries (by mtime) are removed until it is down to 80% of the limit, so that
+    pruning does not run again on the next few builds.
+    Returns (removed entries, removed bytes).
+    """
+    entries = []
+    total = 0
+    for root, _, files in os.walk(cache_dir):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+    if total <= max_bytes:
+        return 0, 0
+
+    removed = removed_bytes = 0
+    target = max_bytes * 0.8
+    for _, size, path in sorted(entries):
+        if total - removed_bytes <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        removed += 1
+        removed_bytes += size
+    logger.info("Pruned %d least recently used compiled template(s) (%d KB) from %s",
+                removed, removed_bytes // 1024, cache_dir)
+    return removed, removed_bytes
@@ -0,0 +1,106 @@
+import os
+import logging
+
+from jinja2 import TemplateNotFound
+
+from .front_matter_parser import parse_front_matter
+
+logger = logging.getLogger(__name__)
+
+def _templates_dir_files(config):
+    """Every file in templates_dir; the fallback dependency set for dynamic references."""
+    files = set()
+    for root, _, file_names in os.walk(config["templates_dir"]):
+        for file_name in file_names:
+            files.add(os.path.join(root, file_name))
+    return files
+
+def template_dependency_files(env, references, config):
+    """
+    Resolves template names referenced by a page (directly or through the templates they
+    extend, include or import) to the files they are loaded from.
+    A dynamic reference (None, e.g. `{% include some_variable %}`) could load any layout,
+    so it makes the page depend on every file in templates_dir.
+    Returns a sorted list of file paths.
+    """
+    files = set()
+    seen = set()
+    pending = list(references)
+    while pending:
+        name = pending.pop()
+        if name is None:
+            files |= _templates_dir_files(config)
+            continue
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            # Loading compiles the template, which records its own references on the environment.
+            template = env.get_template(name)
+        except TemplateNotFound:
+            continue
+        except Exception as e:
+            logger.warning(f"Could not load template '{name}' while resolving dependencies: {e}")
+            continue
+        if template.filename:
+            files.add(template.filename)
+        pending.extend(env.references_by_name.get(name, ()))
+    return sorted(files)
+
+def build_template_graph(env, config, collections_data):
+    """
+    Builds the template dependency graph of the whole site for inspection:
+      * 'templates': template name -> {'file', 'references'} for every template the loader
+        can find (templates_dir, pages_dir and collection paths),
+      * 'pages': page source -> templates its body references,
+      * 'collections': collection item source -> [its layout],
+      * 'dependents': template file -> sorted page and item sources that depend on it.
+    Dynamic references are shown as null.
+    """
+    graph = {"templates": {}, "pages": {}, "collections": {}, "dependents": {}}
+    for name in env.loader.list_templates():
+        try:
+            template = env.get_template(name)
+        except Exception as e:
+            logger.warning(f"Could not load template '{name}': {e}")
+            continue
+        graph["templates"][name] = {"file": template.filename, "references": env.references_by_name.get(name, [])}
+
+    page_references = {}
+    for root, _, files in os.walk(config["pages_dir"]):
+        for page_file in files:
+            if page_file.endswith('.html'):
+                page_path = os.path.join(root, page_file)
+                with open(page_path, 'r', encoding='utf-8') as f:
+                    _, body = parse_front_matter(f.read())
+                try:
+                    env.from_string(body)
+                except Exception as e:
+                    logger.warning(f"Could not parse page '{page_path}': {e}")
+                    continue
+                page_references[page_path] = env.last_references
+                graph["pages"][page_path] = env.last_references
+    for items in collections_data.values():
+        for item in items:
+            layout = item["front_matter"].get("layout")
+            if layout:
+                page_references[item["path"]] = [layout]
+                graph["collections"][item["path"]] = [layout]
+
+    for source_path, references in page_references.items():
+        for file_path in template_dependency_files(env, references, config):
+            graph["dependents"].setdefault(file_path, []).append(source_path)
+    for sources in graph["dependents"].values():
+        sources.sort()
+    return graph
+
+def graph_to_dot(graph):
+    """Renders a template graph from build_template_graph in Graphviz DOT format."""
+    lines = ["digraph templates {"]
+    edges = [(name, info["references"]) for name, info in graph["templates"].items()]
+    edges += list(graph["pages"].items()) + list(graph["collections"].items())
+    for source, references in sorted(edges):
+        for reference in references:
+            lines.append(f'  "{source}" -> "{reference if reference is not None else "<dynamic>"}";')
+    lines.append("}")
+    return "\n".join(lines)
@@ -0,0 +1,50 @@
+from xml.sax.saxutils import escape, quoteattr
+
+class StreamingXMLWriter:
+    """
+    Minimal XML writer that emits elements straight to a text file as they are produced,
+    so documents such as sitemaps and feeds never have to be held in memory.
+    With pretty=True every element starts on its own, indented line.
+    """
+
+    def __init__(self, file, pretty=True, indent="  "):
+        self.file = file
+        self.pretty = pretty
+        self.indent = indent
+        self.depth = 0
+
+    def _newline(self):
+        if self.pretty:
+            self.file.write("\n" + self.indent * self.depth)
+
+    @staticmethod
+    def _attributes(attrs):
+        return "".join(f" {name}={quoteattr(str(value))}" for name, value in (attrs or {}).items())
+
+    def declaration(self):
+        """Writes the XML declaration; call once before the root element."""
+        self.file.write('<?xml version="1.0" encoding="UTF-8"?>')
+
+    def start(self, tag, attrs=None):
+        """Opens an element that will contain child elements."""
+        self._newline()
+        self.file.write(f"<{tag}{self._attributes(attrs)}>")
+        self.depth += 1
+
+    def end(self, tag):
+        """Closes the element opened by the matching start()."""
+        self.depth -= 1
+        self._newline()
+        self.file.write(f"</{tag}>")
+
+    def element(self, tag, text=None, attrs=None):
+        """Writes a complete leaf element with optional text content."""
+        self._newline()
+        if text is None:
+            self.file.write(f"<{tag}{self._attributes(attrs)}/>")
+        else:
+            self.file.write(f"<{tag}{self._attributes(attrs)}>{escape(str(text))}</{tag}>")
+
+    def close(self):
+        """Finishes the document with a trailing newline."""
+        self.file.write("\n")
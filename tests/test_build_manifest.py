@@ -0,0 +1,60 @@
+import os
+
+from ssg.build_manifest import BuildManifest
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def _built_site(tmp_path):
+    """A manifest that recorded one page (with a data file) in a previous build, saved and loaded again."""
+    source = str(tmp_path / "pages" / "index.html")
+    data_file = str(tmp_path / "assets" / "data.json")
+    output = str(tmp_path / "build" / "index.html")
+    _write(source, "<h1>Home</h1>")
+    _write(data_file, '{"a": 1}')
+    _write(output, "<h1>Home</h1>")
+    manifest = BuildManifest(str(tmp_path / "cache" / "manifest.json"), output_dir=str(tmp_path / "build"))
+    manifest.record(output, source, "deps-1", info={}, extra_files=[data_file], site_access={"data:authors": "h1"})
+    manifest.save()
+    return BuildManifest.load({"cache_dir": str(tmp_path / "cache"), "output_dir": str(tmp_path / "build")}), source, data_file, output
+
+def test_unchanged_output_is_fresh(tmp_path):
+    manifest, source, _, output = _built_site(tmp_path)
+    assert manifest.is_fresh(output, source, "deps-1", {"data:authors": "h1"})
+
+def test_changed_source_is_stale(tmp_path):
+    manifest, source, _, output = _built_site(tmp_path)
+    _write(source, "<h1>Welcome</h1>")
+    assert not manifest.is_fresh(output, source, "deps-1", {"data:authors": "h1"})
+
+def test_touched_but_identical_source_is_fresh(tmp_path):
+    manifest, source, _, output = _built_site(tmp_path)
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert manifest.is_fresh(output, source, "deps-1", {"data:authors": "h1"})
+
+def test_changed_dependency_hash_is_stale(tmp_path):
+    manifest, source, _, output = _built_site(tmp_path)
+    assert not manifest.is_fresh(output, source, "deps-2", {"data:authors": "h1"})
+
+def test_changed_extra_file_is_stale(tmp_path):
+    manifest, source, data_file, output = _built_site(tmp_path)
+    _write(data_file, '{"a": 2}')
+    assert not manifest.is_fresh(output, source, "deps-1", {"data:authors": "h1"})
+
+def test_changed_site_key_is_stale(tmp_path):
+    manifest, source, _, output = _built_site(tmp_path)
+    assert not manifest.is_fresh(output, source, "deps-1", {"data:authors": "h2"})
+
+def test_missing_output_is_stale(tmp_path):
+    manifest, source, _, output = _built_site(tmp_path)
+    os.remove(output)
+    assert not manifest.is_fresh(output, source, "deps-1", {"data:authors": "h1"})
+
+def test_stale_outputs_are_removed(tmp_path):
+    manifest, _, _, output = _built_site(tmp_path)
+    assert manifest.remove_stale_outputs(str(tmp_path / "build")) == 1
+    assert not os.path.exists(output)
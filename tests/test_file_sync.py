@@ -0,0 +1,67 @@
+import os
+
+from ssg.build_manifest import BuildManifest
+from ssg.file_sync import sync_tree, copy_tree
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def test_sync_copies_new_files_and_skips_unchanged_ones(tmp_path):
+    source, destination = tmp_path / "static", tmp_path / "build"
+    _write(str(source / "css" / "style.css"), "body {}")
+    _write(str(source / "app.js"), "run();")
+
+    stats = sync_tree(str(source), str(destination))
+    assert (stats["copied_files"], stats["skipped_files"]) == (2, 0)
+    assert _read(str(destination / "css" / "style.css")) == "body {}"
+
+    _write(str(source / "app.js"), "run(1);")
+    stats = sync_tree(str(source), str(destination))
+    assert (stats["copied_files"], stats["skipped_files"]) == (1, 1)
+    assert _read(str(destination / "app.js")) == "run(1);"
+
+def test_sync_prunes_files_without_a_source(tmp_path):
+    source, destination = tmp_path / "static", tmp_path / "build"
+    _write(str(source / "keep.txt"), "keep")
+    _write(str(destination / "keep.txt"), "old")
+    _write(str(destination / "old" / "gone.txt"), "gone")
+
+    stats = sync_tree(str(source), str(destination), prune=True)
+    assert stats["removed_files"] == 1
+    assert sorted(os.listdir(destination)) == ["keep.txt"]
+
+def test_sync_without_prune_keeps_other_files(tmp_path):
+    source, destination = tmp_path / "assets", tmp_path / "build"
+    _write(str(source / "robots.txt"), "User-agent: *")
+    _write(str(destination / "index.html"), "<h1>Home</h1>")
+
+    sync_tree(str(source), str(destination))
+    assert sorted(os.listdir(destination)) == ["index.html", "robots.txt"]
+
+def test_copies_replace_hardlinked_files(tmp_path):
+    source, destination = tmp_path / "static", tmp_path / "build"
+    _write(str(source / "style.css"), "new")
+    previous_build = str(tmp_path / "previous.css")
+    _write(previous_build, "old")
+    os.makedirs(destination)
+    os.link(previous_build, str(destination / "style.css"))
+
+    sync_tree(str(source), str(destination))
+    assert _read(str(destination / "style.css")) == "new"
+    assert _read(previous_build) == "old"
+
+def test_copy_tree_records_copies_in_the_manifest(tmp_path):
+    source, destination = tmp_path / "static", tmp_path / "build"
+    _write(str(source / "css" / "style.css"), "body {}")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"), output_dir=str(destination))
+
+    copy_tree(str(source), str(destination), manifest)
+    assert manifest.current(str(destination / "css" / "style.css")) == {
+        "source": str(source / "css" / "style.css"), "deps": "copy"}
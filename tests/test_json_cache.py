@@ -0,0 +1,54 @@
+import os
+
+from ssg.json_cache import JSONFileCache
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def test_unchanged_file_is_a_hit(tmp_path):
+    path = str(tmp_path / "data.json")
+    _write(path, '{"a": 1}')
+    cache = JSONFileCache()
+
+    assert cache.load(path) is cache.load(path)
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+
+def test_changed_file_is_reloaded(tmp_path):
+    path = str(tmp_path / "data.json")
+    _write(path, '{"a": 1}')
+    cache = JSONFileCache()
+    cache.load(path)
+
+    _write(path, '{"a": 22}')
+    assert cache.load(path) == {"a": 22}
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9)) # Same size, newer mtime
+    cache.load(path)
+    assert cache.stats() == {"hits": 0, "misses": 3, "evictions": 0}
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    paths = [str(tmp_path / f"data_{i}.json") for i in range(3)]
+    for path in paths:
+        _write(path, '{"value": 1}') # 12 bytes each
+    cache = JSONFileCache(max_bytes=30)
+
+    cache.load(paths[0])
+    cache.load(paths[1])
+    cache.load(paths[0]) # paths[1] is now the least recently used
+    cache.load(paths[2])
+    assert cache.evictions == 1
+    cache.take_stats()
+    cache.load(paths[0])
+    cache.load(paths[1])
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1}
+
+def test_files_over_the_limit_are_not_cached(tmp_path):
+    path = str(tmp_path / "big.json")
+    _write(path, '{"value": "' + "x" * 100 + '"}')
+    cache = JSONFileCache(max_bytes=50)
+
+    cache.load(path)
+    cache.load(path)
+    assert cache.stats() == {"hits": 0, "misses": 2, "evictions": 0}
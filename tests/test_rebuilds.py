@@ -0,0 +1,150 @@
+import os
+import json
+import shutil
+
+import pytest
+
+from ssg.build_core import Site
+
+# The sample site lives at the repository root.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files and directories of the sample site copied into the scratch directory.
+SAMPLE_SITE = ("config.json", "pages", "_posts", "_data", "assets", "static", "templates")
+
+ALL_PAGES = {"index.html", "about.html", "test/about.html", "blog/index.html", "products/widget.html",
+             "blog/first-post.html", "blog/second-post.html"}
+POSTS = {"blog/first-post.html", "blog/second-post.html"}
+LISTING_PAGES = {"index.html", "blog/index.html"} # The pages that list site.collections.posts
+
+NEW_PAGE = """+++
+{"layout": "base.html", "title": "New Page"}
++++
+{% extends "base.html" %}
+{% block content %}<h1>New</h1>{% endblock %}
+"""
+
+def _append(path, text):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def _edit_json(path, change):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    change(data)
+    _write(path, json.dumps(data, indent=4))
+
+def _rename_author(data):
+    data[0]["name"] += " Jr."
+
+def _add_social_link(data):
+    data["social_links"]["mastodon"] = "https://example.social/@site"
+
+# Each scenario: (description, edit applied to the sample site, how the site is rebuilt, changed
+# paths passed to Site.update, expected re-rendered pages, expected removed outputs).
+# "update" is a targeted rebuild of the warm Site, "build" an incremental build of the warm
+# Site and "cold" an incremental build by a new Site (a new process, as far as the build can tell).
+# Scenarios run in order on the same site, so each one starts from the state the previous left.
+SCENARIOS = (
+    ("nothing changed", None, "build", None, set(), set()),
+    ("edit a post", lambda: _append("_posts/first-post.html", "<p>Edited.</p>\n"), "update",
+     ["_posts/first-post.html"], {"blog/first-post.html"} | LISTING_PAGES, set()),
+    ("cold build after a targeted rebuild", None, "cold", None, set(), set()),
+    ("edit a post, then build", lambda: _append("_posts/second-post.html", "<p>Edited.</p>\n"), "build",
+     None, {"blog/second-post.html"} | LISTING_PAGES, set()),
+    ("edit the post layout", lambda: _append("templates/post.html", "\n"), "update",
+     ["templates/post.html"], POSTS, set()),
+    ("edit the base layout", lambda: _append("templates/base.html", "\n"), "update",
+     ["templates/base.html"], ALL_PAGES, set()),
+    ("edit a page", lambda: _append("pages/about.html", "\n"), "update",
+     ["pages/about.html"], {"about.html"}, set()),
+    ("edit a page data file", lambda: _edit_json("assets/products/detailed_widget_info.json", lambda d: d.update(checked=True)),
+     "update", ["assets/products/detailed_widget_info.json"], {"products/widget.html"}, set()),
+    ("add a page", lambda: _write("pages/new.html", NEW_PAGE), "update", ["pages/new.html"], {"new.html"}, set()),
+    ("delete a page", lambda: os.remove("pages/new.html"), "update", ["pages/new.html"], set(), {"new.html"}),
+    ("delete a post", lambda: shutil.move("_posts/second-post.html", "second-post.html.bak"), "update",
+     ["_posts/second-post.html"], LISTING_PAGES, {"blog/second-post.html"}),
+    ("restore the post", lambda: shutil.move("second-post.html.bak", "_posts/second-post.html"), "update",
+     ["_posts/second-post.html"], {"blog/second-post.html"} | LISTING_PAGES, set()),
+    ("delete a static file", lambda: shutil.move("static/css/style.css", "style.css.bak"), "update",
+     ["static/css/style.css"], set(), {"static/css/style.css"}),
+    ("restore the static file", lambda: shutil.move("style.css.bak", "static/css/style.css"), "update",
+     ["static/css/style.css"], set(), set()),
+    ("edit site data", lambda: _edit_json("_data/authors.json", _rename_author), "update",
+     ["_data/authors.json"], ALL_PAGES, set()),
+    ("cold build after everything", None, "cold", None, set(), set()),
+)
+
+# The same site with "track_site_access": only pages reading a changed data file or collection
+# are re-rendered.
+TRACKED_SCENARIOS = (
+    ("nothing changed", None, "build", None, set(), set()),
+    ("edit authors.json", lambda: _edit_json("_data/authors.json", _rename_author), "update",
+     ["_data/authors.json"], {"index.html", "blog/index.html"} | POSTS, set()),
+    ("edit settings.json, read by every page", lambda: _edit_json("_data/settings.json", _add_social_link), "update",
+     ["_data/settings.json"], ALL_PAGES, set()),
+    ("edit a post", lambda: _append("_posts/second-post.html", "<p>Edited.</p>\n"), "update",
+     ["_posts/second-post.html"], {"blog/second-post.html"} | LISTING_PAGES, set()),
+    ("cold build", None, "cold", None, set(), set()),
+)
+
+def _output_state(output_dir):
+    """{output path relative to output_dir: (inode, mtime_ns)}; rendering replaces the file."""
+    state = {}
+    for root, _, files in os.walk(output_dir):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            st = os.stat(path)
+            state[os.path.relpath(path, output_dir)] = (st.st_ino, st.st_mtime_ns)
+    return state
+
+def run_scenarios(root, scenarios, config_changes=None):
+    """
+    Builds a copy of the sample site in 'root' (the current directory), then runs 'scenarios' on it.
+    Returns a list of (description, expected rendered, rendered, expected removed, removed).
+    """
+    for name in SAMPLE_SITE:
+        source = os.path.join(REPO_ROOT, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(root, name))
+        else:
+            shutil.copy2(source, os.path.join(root, name))
+    _edit_json("config.json", lambda config: config.update(config_changes or {}))
+    site = Site("config.json")
+    site.build(clean=True)
+    output_dir = site.config["output_dir"]
+    results = []
+    for description, edit, how, paths, expected_rendered, expected_removed in scenarios:
+        before = _output_state(output_dir)
+        if edit:
+            edit()
+        if how == "update":
+            site.update(paths)
+        else:
+            if how == "cold":
+                site = Site("config.json")
+            site.build()
+        after = _output_state(output_dir)
+        rendered = {path for path, state in after.items() if path.endswith(".html") and before.get(path) != state}
+        removed = set(before) - set(after)
+        results.append((description, expected_rendered, rendered, expected_removed, removed))
+    return results
+
+@pytest.mark.parametrize("scenarios, config_changes", [
+    (SCENARIOS, None),
+    (TRACKED_SCENARIOS, {"track_site_access": True}),
+], ids=["default", "track_site_access"])
+def test_rebuilds_render_exactly_the_affected_pages(tmp_path, monkeypatch, scenarios, config_changes):
+    monkeypatch.chdir(tmp_path)
+    mismatches = [
+        f"{description}: rendered {sorted(rendered)} (expected {sorted(expected_rendered)}), "
+        f"removed {sorted(removed)} (expected {sorted(expected_removed)})"
+        for description, expected_rendered, rendered, expected_removed, removed
+        in run_scenarios(tmp_path, scenarios, config_changes)
+        if rendered != expected_rendered or removed != expected_removed
+    ]
+    assert not mismatches, "\n".join(mismatches)
@@ -0,0 +1,59 @@
+import os
+
+from jinja2 import DictLoader
+
+from ssg.template_cache import CachingEnvironment, prune_compiled_cache
+
+
+def _environment(cache_dir, templates=None):
+    return CachingEnvironment(loader=DictLoader(templates or {}), compiled_cache_dir=str(cache_dir))
+
+def _cache_entries(cache_dir):
+    return sorted(os.path.join(root, name) for root, _, files in os.walk(cache_dir) for name in files)
+
+def test_compiled_templates_are_reused_across_environments(tmp_path):
+    cache_dir = tmp_path / "templates"
+    first = _environment(cache_dir, {"base.html": "<p>{% block body %}{% endblock %}</p>"})
+    first.from_string('{% extends "base.html" %}{% block body %}{{ name }}{% endblock %}')
+    assert (first.compiled_cache_hits, first.compiled_cache_misses) == (0, 1)
+
+    second = _environment(cache_dir, {"base.html": "<p>{% block body %}{% endblock %}</p>"})
+    template = second.from_string('{% extends "base.html" %}{% block body %}{{ name }}{% endblock %}')
+    assert second.compiled_cache_hits == 1
+    assert second.last_references == ["base.html"]
+    assert template.render(name="x") == "<p>x</p>"
+
+def test_changed_source_misses_the_cache(tmp_path):
+    cache_dir = tmp_path / "templates"
+    _environment(cache_dir).from_string("<p>{{ a }}</p>")
+
+    env = _environment(cache_dir)
+    assert env.from_string("<p>{{ b }}</p>").render(b="new") == "<p>new</p>"
+    assert (env.compiled_cache_hits, env.compiled_cache_misses) == (0, 1)
+    assert len(_cache_entries(cache_dir)) == 2
+
+def test_prune_keeps_the_cache_under_its_limit(tmp_path):
+    cache_dir = tmp_path / "templates"
+    env = _environment(cache_dir)
+    for i in range(10):
+        env.from_string(f"<p>{{{{ value_{i} }}}}</p>")
+    entries = _cache_entries(cache_dir)
+    for age, path in enumerate(entries):
+        os.utime(path, ns=(0, (age + 1) * 10**9)) # entries[0] is the least recently used
+    total = sum(os.path.getsize(path) for path in entries)
+
+    assert prune_compiled_cache(str(cache_dir), total) == (0, 0)
+    removed, removed_bytes = prune_compiled_cache(str(cache_dir), total // 2)
+    remaining = _cache_entries(cache_dir)
+    assert removed == len(entries) - len(remaining)
+    assert sum(os.path.getsize(path) for path in remaining) <= total // 2 * 0.8
+    assert remaining == entries[removed:] # The most recently used entries survive
+
+def test_hits_mark_entries_as_recently_used(tmp_path):
+    cache_dir = tmp_path / "templates"
+    _environment(cache_dir).from_string("<p>{{ a }}</p>")
+    [path] = _cache_entries(cache_dir)
+    os.utime(path, ns=(0, 10**9))
+
+    _environment(cache_dir).from_string("<p>{{ a }}</p>")
+    assert os.stat(path).st_mtime_ns > 10**9